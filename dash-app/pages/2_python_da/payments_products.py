@@ -19,11 +19,11 @@ PROJECT_ROOT = APP_DIR.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
-from src.analytics_payments import load_deals_for_payments, payment_product_metrics  # type: ignore
+from src.analytics_payments import load_deals_for_payments, month_options, payment_product_metrics  # type: ignore
 
 # Загружаем очищенные сделки один раз при импорте страницы.
 DEALS_DF = load_deals_for_payments()
-MONTH_OPTIONS = sorted(m for m in DEALS_DF["month"].dropna().unique())
+MONTH_OPTIONS = month_options(DEALS_DF)
 
 # Целевые продукты, которые показываем в визуализации.
 TARGET_PRODUCTS = ["Web Developer", "Digital Marketing", "UX/UI Design"]
@@ -183,7 +183,8 @@ def update_payments_treemap(month_value: str, value_metric: str):
 
     plot_df = df.copy()
     for col in ["Payment Type", "Product", "Education Type"]:
-        plot_df[col] = plot_df[col].fillna("unknown")
+        # Payment Type хранится как category: новое значение "unknown" заполняем уже в object
+        plot_df[col] = plot_df[col].astype(object).fillna("unknown")
 
     metric_label = VALUE_TITLES.get(value_metric, value_metric)
     fig = px.treemap(
@@ -20,6 +20,8 @@ except Exception:  # pragma: no cover - fallback for standalone runs
     CLEAN_DIR = BASE_DIR / "data" / "clean"
     TEMP_DIR = BASE_DIR / "data" / "temp"
 
+from .io import read_clean
+
 DEALS_FILE = Path(CLEAN_DIR) / "Deals.parquet"
 CITY_COORDS_FILE = Path(TEMP_DIR) / "city_coords.parquet"
 
@@ -70,26 +72,11 @@ def normalize_level(val) -> Optional[str]:
     return match.group() if match else None
 
 
-def _read_deals_table() -> pd.DataFrame:
-    """
-    Загружает Deals из data/clean: приоритет Parquet, затем CSV.
-    """
-    if DEALS_FILE.exists():
-        try:
-            return pd.read_parquet(DEALS_FILE)
-        except Exception:
-            pass
-    csv_path = DEALS_FILE.with_suffix(".csv")
-    if csv_path.exists():
-        return pd.read_csv(csv_path)
-    raise FileNotFoundError(f"Не найден файл Deals в {DEALS_FILE.parent}")
-
-
 def load_deals() -> pd.DataFrame:
     """
     Загрузить сделки, добавить success и нормализованный уровень языка.
     """
-    deals = _read_deals_table()
+    deals = read_clean("Deals")
     deals = deals.rename(columns={"Level of Deutsch": "level_raw"})
     deals["success"] = deals["Stage"].eq("payment done") & deals["City"].notna() & deals["City"].ne("-")
     deals["level_norm"] = deals["level_raw"].map(normalize_level)
@@ -136,6 +123,31 @@ def _filter_bbox(df: pd.DataFrame) -> pd.DataFrame:
     ]
 
 
+def _city_counts(base: pd.DataFrame) -> pd.DataFrame:
+    """
+    Сделки, оплаты и win_rate по городам через value_counts (success - булев флаг); City остается индексом.
+    """
+    deals_per_city = base["City"].value_counts(sort=False)
+    paid_mask = base["success"].to_numpy(dtype=bool, na_value=False)
+    paid_per_city = base.loc[paid_mask, "City"].value_counts(sort=False)
+    agg = pd.DataFrame({"deals": deals_per_city})
+    agg["paid"] = paid_per_city.reindex(agg.index, fill_value=0)
+    agg = agg.sort_index().rename_axis("City")
+    agg["win_rate"] = agg["paid"] / agg["deals"]
+    return agg
+
+
+def _attach_coords(agg: pd.DataFrame, coords: pd.DataFrame) -> pd.DataFrame:
+    """
+    Подставляет lat/lon по индексу City через lookup вместо merge; города без координат отбрасываются.
+    Индекс сбрасывается один раз - на выходе.
+    """
+    lookup = coords.drop_duplicates(subset="City").set_index("City")
+    agg["lat"] = agg.index.map(lookup["lat"])
+    agg["lon"] = agg.index.map(lookup["lon"])
+    return agg.dropna(subset=["lat", "lon"]).reset_index()
+
+
 def make_city_summary(deals: pd.DataFrame, coords: pd.DataFrame) -> pd.DataFrame:
     """
     Агрегаты по городам: сделки, оплаты, win_rate + координаты (bbox DE).
@@ -143,14 +155,8 @@ def make_city_summary(deals: pd.DataFrame, coords: pd.DataFrame) -> pd.DataFrame
     if deals is None or deals.empty or coords is None or coords.empty:
         return pd.DataFrame(columns=["City", "deals", "paid", "win_rate", "lat", "lon"])
     base = deals.loc[deals["City"].notna() & deals["City"].ne("-"), ["City", "success"]]
-    agg = (
-        base.groupby("City")
-        .agg(deals=("success", "size"), paid=("success", "sum"))
-        .reset_index()
-    )
-    agg["win_rate"] = agg["paid"] / agg["deals"]
-    merged = agg.merge(coords, on="City", how="inner")
-    return _filter_bbox(merged)
+    agg = _city_counts(base)
+    return _filter_bbox(_attach_coords(agg, coords))
 
 
 def make_level_city_summary(deals: pd.DataFrame, coords: pd.DataFrame, level: Optional[str]) -> pd.DataFrame:
@@ -165,11 +171,5 @@ def make_level_city_summary(deals: pd.DataFrame, coords: pd.DataFrame, level: Op
     ]
     if subset.empty or coords is None or coords.empty:
         return pd.DataFrame(columns=["City", "deals", "paid", "win_rate", "lat", "lon"])
-    agg = (
-        subset.groupby("City")
-        .agg(deals=("success", "size"), paid=("success", "sum"))
-        .reset_index()
-    )
-    agg["win_rate"] = agg["paid"] / agg["deals"]
-    merged = agg.merge(coords, on="City", how="inner")
-    return _filter_bbox(merged)
+    agg = _city_counts(subset)
+    return _filter_bbox(_attach_coords(agg, coords))
@@ -1,16 +1,32 @@
 ﻿from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Optional, Sequence, Union
 
 import numpy as np
 import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .analytics_utils import safe_div, stage_masks
 
 try:
     from .io import CLEAN_DIR  # type: ignore
 except Exception:
     CLEAN_DIR = Path(__file__).resolve().parents[1] / "data" / "clean"
 
+# Столбцы Deals, которые нужны для агрегатов по платежам.
+_PAYMENT_COLUMNS = [
+    "Id",
+    "Stage",
+    "Created Time",
+    "Closing Date",
+    "Payment Type",
+    "Product",
+    "Education Type",
+    "Offer Total Amount",
+]
+
 
 def load_deals_for_payments() -> pd.DataFrame:
     """
@@ -26,45 +42,117 @@ def load_deals_for_payments() -> pd.DataFrame:
         deals = pd.read_csv(csv_path)
     else:
         raise FileNotFoundError(f"Не найден файл Deals в директории {base}")
+    return _prepare_payment_deals(deals)
+
 
+def _prepare_payment_deals(deals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Приводит даты, добавляет month/month_key и флаги статуса.
+    """
     deals["Created Time"] = pd.to_datetime(deals["Created Time"], errors="coerce")
     deals["Closing Date"] = pd.to_datetime(deals["Closing Date"], errors="coerce")
-    deals["month"] = deals["Created Time"].dt.to_period("M").astype("string")
+    deals["month_key"] = _month_key_series(deals["Created Time"])
+    deals["month"] = _month_categorical(deals["month_key"].to_numpy())
     return _add_status_flags(deals)
 
 
-def _add_status_flags(df: pd.DataFrame) -> pd.DataFrame:
+def _month_key_series(created: pd.Series) -> pd.Series:
     """
-    Добавляет булевые признаки статуса сделки: is_paid, is_closed, is_lost.
+    Целочисленный ключ месяца year * 12 + (month - 1); для пустых дат -1.
     """
-    result = df.copy()
-    stage_str = result["Stage"].astype("string")
+    key = created.dt.year * 12 + created.dt.month - 1
+    return key.fillna(-1).astype("int32")
 
-    result["is_paid"] = stage_str.str.contains("payment done", case=False, na=False)
-    result["is_closed"] = result["Closing Date"].notna()
-    result["is_lost"] = stage_str.str.contains("lost", case=False, na=False)
-    result.loc[result["is_paid"], "is_lost"] = False
-    return result
+
+def _month_label(key: int) -> str:
+    """
+    Строка 'YYYY-MM' для ключа month_key.
+    """
+    return f"{key // 12:04d}-{key % 12 + 1:02d}"
 
 
-def _safe_div(num: pd.Series, den: pd.Series) -> pd.Series:
+def _month_categorical(keys: np.ndarray) -> pd.Categorical:
+    """
+    Столбец month как категории 'YYYY-MM': строки строятся только для уникальных ключей, пустые даты - NaN.
     """
-    Безопасное деление столбцов (деление на ноль заменяем на 0).
+    uniq, codes = np.unique(keys, return_inverse=True)
+    if len(uniq) and uniq[0] < 0:
+        uniq, codes = uniq[1:], codes - 1
+    return pd.Categorical.from_codes(codes, categories=[_month_label(int(k)) for k in uniq])
+
+
+def month_options(deals: pd.DataFrame) -> list[str]:
     """
-    return num.div(den.replace(0, np.nan)).fillna(0.0)
+    Отсортированный список месяцев 'YYYY-MM' для выпадающего списка (по уникальным month_key).
+    """
+    keys = np.unique(deals["month_key"].to_numpy())
+    return [_month_label(int(k)) for k in keys if k >= 0]
+
+
+def _scan_deals(
+    month: Optional[Union[str, int]] = None,
+    target_products: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Читает из Deals.parquet только нужные столбцы; фильтры по месяцу (диапазон Created Time)
+    и продуктам выполняет pyarrow при сканировании, отсекая row group по статистикам.
+    """
+    dataset = ds.dataset(Path(CLEAN_DIR) / "Deals.parquet", format="parquet")
+    flt = None
+    if month:
+        key = _month_key(month)
+        start = pd.Timestamp(year=key // 12, month=key % 12 + 1, day=1)
+        end = start + pd.offsets.MonthBegin(1)
+        flt = (pc.field("Created Time") >= start) & (pc.field("Created Time") < end)
+    if target_products:
+        product_flt = pc.field("Product").isin(list(target_products))
+        flt = product_flt if flt is None else flt & product_flt
+    table = dataset.to_table(columns=_PAYMENT_COLUMNS, filter=flt)
+    return _prepare_payment_deals(table.to_pandas())
+
+
+def _month_key(month: Union[str, int]) -> int:
+    """
+    Переводит месяц 'YYYY-MM' (или готовый ключ) в целочисленный ключ month_key.
+    """
+    if isinstance(month, (int, np.integer)):
+        return int(month)
+    period = pd.Period(month, freq="M")
+    return period.year * 12 + period.month - 1
+
+
+def _add_status_flags(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Добавляет булевые признаки статуса сделки: is_paid, is_closed, is_lost.
+    """
+    is_paid, is_lost = stage_masks(df["Stage"])
+
+    # Неглубокая копия: новые столбцы попадают только в результат, исходные блоки не дублируются.
+    result = df.copy(deep=False)
+    result["is_paid"] = is_paid
+    result["is_closed"] = df["Closing Date"].notna()
+    result["is_lost"] = is_lost
+    return result
 
 
 def payment_product_metrics(
-    deals: pd.DataFrame,
-    month: Optional[str] = None,
+    deals: Optional[pd.DataFrame] = None,
+    month: Optional[Union[str, int]] = None,
     target_products: Optional[Sequence[str]] = None,
 ) -> pd.DataFrame:
     """
     Возвращает агрегаты по типу оплаты, продукту и типу обучения.
+    month - строка 'YYYY-MM' или ключ month_key.
+    Если deals не передан, сделки читаются из Deals.parquet с фильтрами на уровне сканирования.
     """
+    if deals is None:
+        if (Path(CLEAN_DIR) / "Deals.parquet").exists():
+            deals = _scan_deals(month, target_products)
+        else:
+            deals = load_deals_for_payments()
     df = deals.copy()
     if month:
-        df = df[df["month"] == month]
+        df = df[df["month_key"] == _month_key(month)]
     if target_products:
         df = df[df["Product"].isin(target_products)]
 
@@ -86,15 +174,14 @@ def payment_product_metrics(
     df["Offer Total Amount"] = pd.to_numeric(df["Offer Total Amount"], errors="coerce").fillna(0.0)
 
     grouped = (
-        df.groupby(["Payment Type", "Product", "Education Type"], dropna=False)
+        df.groupby(["Payment Type", "Product", "Education Type"], dropna=False, observed=True)
         .agg(
             n_deals=("Id", "count"),
             n_paid=("is_paid", "sum"),
             n_lost=("is_lost", "sum"),
             revenue_total=("Offer Total Amount", "sum"),
         )
-        .reset_index()
     )
-    grouped["cr_deals_to_paid"] = _safe_div(grouped["n_paid"], grouped["n_deals"])
-    grouped["lost_rate"] = _safe_div(grouped["n_lost"], grouped["n_deals"])
-    return grouped
+    grouped["cr_deals_to_paid"] = safe_div(grouped["n_paid"], grouped["n_deals"])
+    grouped["lost_rate"] = safe_div(grouped["n_lost"], grouped["n_deals"])
+    return grouped.reset_index()
@@ -1,39 +1,35 @@
 from __future__ import annotations
 
-from pathlib import Path
+import inspect
 from typing import Dict, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from .analytics_utils import safe_div, stage_masks
+from .io import read_clean
+
 try:
-    from .io import CLEAN_DIR  # type: ignore
-except Exception:
-    CLEAN_DIR = Path(__file__).resolve().parents[1] / "data" / "clean"
+    import polars as pl  # type: ignore
+except ImportError:  # pragma: no cover - polars необязателен
+    pl = None
 
+# Считать owner_metrics через ленивый план Polars (если пакет установлен); по умолчанию - pandas.
+# Нужен polars >= 0.20.5 (pl.len); см. requirements-optional.txt.
+USE_POLARS = False
 
-def _load_table(name: str) -> pd.DataFrame:
-    """
-    Загружает parquet/csv по имени файла из каталога с очищенными данными.
-    """
-    base = Path(CLEAN_DIR)
-    parquet_path = base / f"{name}.parquet"
-    if parquet_path.exists():
-        try:
-            return pd.read_parquet(parquet_path)
-        except Exception:
-            pass
-    csv_path = base / f"{name}.csv"
-    if csv_path.exists():
-        return pd.read_csv(csv_path)
-    raise FileNotFoundError(f"Не найден файл для набора {name} в {base}")
+# Соединение с равенством пустых ключей: в polars >= 1.24 параметр join_nulls переименован в nulls_equal.
+if pl is not None:
+    _JOIN_NULLS_KW = "nulls_equal" if "nulls_equal" in inspect.signature(pl.LazyFrame.join).parameters else "join_nulls"
+else:
+    _JOIN_NULLS_KW = "nulls_equal"
 
 
 def load_deals_calls() -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Читает Deals/Calls и приводит к удобным названиям/типам.
     """
-    deals = _load_table("Deals").rename(
+    deals = read_clean("Deals").rename(
         columns={
             "Id": "deal_id",
             "Created Time": "created_time",
@@ -46,7 +42,8 @@ def load_deals_calls() -> Tuple[pd.DataFrame, pd.DataFrame]:
             "Lost Reason": "lost_reason",
         }
     )
-    calls = _load_table("Calls").rename(
+    # Звонки без длительности в метриках не участвуют - отбрасываем их ещё при чтении файла.
+    calls = read_clean("Calls", filters=[("Call Duration (in seconds)", ">", 0)]).rename(
         columns={
             "Id": "call_id",
             "Call Start Time": "call_start_time",
@@ -62,43 +59,65 @@ def load_deals_calls() -> Tuple[pd.DataFrame, pd.DataFrame]:
     return deals, calls
 
 
+def _calls_after_created(deals: pd.DataFrame, calls: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Для каждой сделки: число звонков контакту не раньше created_time и время первого такого звонка.
+
+    Вместо merge по contact_id (K сделок x M звонков на контакт) звонки сортируются
+    по ключу (контакт, время), а позиция сделки в нём ищется через searchsorted.
+    """
+    n_deals = len(deals)
+    # use_na_sentinel=False: пустой contact_id сопоставляется с пустым, как в merge.
+    contact_codes, _ = pd.factorize(
+        pd.concat([deals["contact_id"], calls["contact_id"]], ignore_index=True),
+        use_na_sentinel=False,
+    )
+    times = np.concatenate(
+        [
+            deals["created_time"].to_numpy(dtype="datetime64[ns]"),
+            calls["call_start_time"].to_numpy(dtype="datetime64[ns]"),
+        ]
+    )
+    # Плотные ранги времени, чтобы пара (контакт, время) уместилась в один int64-ключ.
+    uniq_times, time_ranks = np.unique(times, return_inverse=True)
+    n_ranks = max(len(uniq_times), 1)
+    keys = contact_codes.astype(np.int64) * n_ranks + time_ranks
+
+    deal_keys = keys[:n_deals]
+    order = np.argsort(keys[n_deals:], kind="stable")
+    call_keys = keys[n_deals:][order]
+    call_times = times[n_deals:][order]
+
+    lo = np.searchsorted(call_keys, deal_keys, side="left")
+    hi = np.searchsorted(call_keys, (contact_codes[:n_deals] + 1) * n_ranks, side="left")
+    calls_cnt = hi - lo
+    calls_cnt[np.isnat(times[:n_deals])] = 0
+
+    first_call_time = np.full(n_deals, np.datetime64("NaT"), dtype="datetime64[ns]")
+    has_call = calls_cnt > 0
+    first_call_time[has_call] = call_times[lo[has_call]]
+    return calls_cnt, first_call_time
+
+
 def _prepare_with_calls(deals: pd.DataFrame, calls: pd.DataFrame) -> pd.DataFrame:
     """
     Заполняет сделки агрегатами по звонкам и расчётными флагами/суммами.
     """
-    valid_calls = calls.copy()
-    valid_calls["call_duration"] = valid_calls["call_duration"].fillna(0)
-    valid_calls = valid_calls[valid_calls["call_duration"] > 0]
-    valid_calls = valid_calls[valid_calls["call_start_time"].notna()]
-
-    calls_join = (
-        deals[["deal_id", "contact_id", "created_time"]]
-        .merge(
-            valid_calls[["call_id", "contact_id", "call_start_time"]],
-            on="contact_id",
-            how="left",
-        )
-        .dropna(subset=["call_start_time", "created_time"])
-    )
-    calls_join = calls_join[calls_join["call_start_time"] >= calls_join["created_time"]]
+    # Отбираем звонки одной маской и только нужные столбцы, без копии всей таблицы Calls.
+    valid_mask = (calls["call_duration"].fillna(0) > 0) & calls["call_start_time"].notna()
+    valid_calls = calls.loc[valid_mask, ["call_id", "contact_id", "call_start_time"]]
 
-    calls_by_deal = (
-        calls_join.groupby("deal_id", dropna=False)
-        .agg(
-            calls_cnt=("call_id", "count"),
-            first_call_time=("call_start_time", "min"),
-        )
-        .reset_index()
-    )
+    calls_cnt, first_call_time = _calls_after_created(deals, valid_calls)
 
-    df = deals.merge(calls_by_deal, how="left", on="deal_id")
-    df["calls_cnt"] = df["calls_cnt"].fillna(0)
+    df = deals.copy(deep=False)
+    df["calls_cnt"] = calls_cnt
+    df["first_call_time"] = first_call_time
     df["has_call"] = df["calls_cnt"] > 0
 
-    df["is_paid"] = df["stage"].str.lower().str.contains("payment done", na=False)
-    df["is_closed"] = df["closing_date"].notna()
-    df["is_lost"] = df["stage"].str.lower().str.contains("lost", na=False)
-    df.loc[df["is_paid"], "is_lost"] = False
+    is_paid, is_lost = stage_masks(df["stage"])
+    df["is_paid"] = is_paid
+    df["is_closed"] = ~np.isnat(df["closing_date"].to_numpy(dtype="datetime64[ns]"))
+    df["is_lost"] = is_lost
 
     df["offer_total"] = df["offer_total"].fillna(0)
     df["initial_amount"] = df["initial_amount"].fillna(0)
@@ -118,15 +137,21 @@ def owner_metrics(
     """
     Возвращает агрегаты по менеджерам и причинам потерь (опционально фильтр по месяцу).
     """
+    if USE_POLARS and pl is not None:
+        return owner_metrics_polars(deals, calls, month=month)
+
     df = _prepare_with_calls(deals, calls)
     if month:
         df = df[df["month"] == month]
 
-    def safe_div(num: pd.Series, den: pd.Series) -> pd.Series:
-        return num.div(den.replace(0, np.nan)).fillna(0)
+    # Один стабильный сорт по ключам + категориальный deal_owner: обе группировки идут по упорядоченным
+    # кодам с sort=False, а порядок групп совпадает с sort=True (пропуски - в конце).
+    owner_dtype = df["deal_owner"].dtype
+    df = df.sort_values(["deal_owner", "lost_reason"], kind="stable", na_position="last")
+    df["deal_owner"] = df["deal_owner"].astype("category")
 
     owners = (
-        df.groupby("deal_owner", dropna=False)
+        df.groupby("deal_owner", dropna=False, sort=False, observed=True)
         .agg(
             n_deals=("deal_id", "count"),
             n_processed=("is_processed", "sum"),
@@ -138,9 +163,36 @@ def owner_metrics(
             n_processed_with_calls=("has_call", "sum"),
             avg_lead_to_first_call_hours=("lead_to_first_call_hours", "mean"),
         )
-        .reset_index()
     )
+    owners = _add_owner_ratios(_restore_owner_dtype(owners, owner_dtype)).reset_index()
+
+    lost = df[df["is_lost"].to_numpy()]
+    lost_reason_by_owner = (
+        lost.groupby(["deal_owner", "lost_reason"], dropna=False, sort=False, observed=True)
+        .agg(n_lost=("deal_id", "count"))
+    )
+    lost_reason_by_owner = _restore_owner_dtype(lost_reason_by_owner, owner_dtype)
+    lost_reason_by_owner = _add_lost_shares(lost_reason_by_owner).reset_index()
+
+    return {"owners": owners, "lost_reason_by_owner": lost_reason_by_owner}
+
+
+def _restore_owner_dtype(agg: pd.DataFrame, dtype) -> pd.DataFrame:
+    """
+    Возвращает уровню deal_owner исходный тип (наружу категориальный индекс не отдаем).
+    """
+    idx = agg.index
+    if isinstance(idx, pd.MultiIndex):
+        agg.index = idx.set_levels(idx.levels[0].astype(dtype), level=0)
+    else:
+        agg.index = idx.astype(dtype)
+    return agg
+
 
+def _add_owner_ratios(owners: pd.DataFrame) -> pd.DataFrame:
+    """
+    Добавляет к агрегатам по менеджерам конверсии, выручку на сделку и долю потерь.
+    """
     owners["cr_deals_to_paid"] = safe_div(owners["n_paid"], owners["n_deals"])
     owners["cr_processed_to_paid"] = safe_div(owners["n_paid"], owners["n_processed"])
     owners["revenue_per_paid"] = safe_div(owners["revenue_won"], owners["n_paid"])
@@ -153,13 +205,14 @@ def owner_metrics(
     )
     owners["lost_rate_by_closed"] = safe_div(owners["n_lost"], owners["n_processed"])
     owners["lost_rate_by_all"] = safe_div(owners["n_lost"], owners["n_deals"])
+    return owners
 
-    lost = df[df["is_lost"]].copy()
-    lost_reason_by_owner = (
-        lost.groupby(["deal_owner", "lost_reason"], dropna=False)
-        .agg(n_lost=("deal_id", "count"))
-        .reset_index()
-    )
+
+def _add_lost_shares(lost_reason_by_owner: pd.DataFrame) -> pd.DataFrame:
+    """
+    Добавляет общее число потерь менеджера и долю каждой причины в них
+    (deal_owner может быть как столбцом, так и уровнем индекса).
+    """
     if len(lost_reason_by_owner):
         lost_reason_by_owner["n_lost_total_owner"] = (
             lost_reason_by_owner.groupby("deal_owner")["n_lost"].transform("sum")
@@ -170,5 +223,86 @@ def owner_metrics(
     else:
         lost_reason_by_owner["n_lost_total_owner"] = 0
         lost_reason_by_owner["share_owner_lost"] = 0.0
+    return lost_reason_by_owner
+
+
+def owner_metrics_polars(
+    deals: pd.DataFrame,
+    calls: pd.DataFrame,
+    month: Optional[str] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    То же, что owner_metrics, но join/фильтры/группировки собраны в один ленивый план Polars
+    (многопоточное выполнение, без промежуточных pandas-таблиц). Требует пакет polars.
+    """
+    if pl is None:
+        raise ImportError("Для owner_metrics_polars нужен пакет polars")
+
+    deal_cols = ["deal_id", "contact_id", "created_time", "closing_date", "stage", "offer_total",
+                 "deal_owner", "lost_reason", "month", "SLA"]
+    deals_lf = (
+        pl.from_pandas(deals[[c for c in deal_cols if c in deals.columns]])
+        .lazy()
+        .with_row_index("_row")
+    )
+    if "SLA" not in deals.columns:
+        deals_lf = deals_lf.with_columns(pl.lit(None, dtype=pl.Float64).alias("SLA"))
+    calls_lf = (
+        pl.from_pandas(calls[["contact_id", "call_start_time", "call_duration"]])
+        .lazy()
+        .filter((pl.col("call_duration").fill_null(0) > 0) & pl.col("call_start_time").is_not_null())
+        .select("contact_id", "call_start_time")
+    )
+
+    calls_by_deal = (
+        deals_lf.select("_row", "contact_id", "created_time")
+        .join(calls_lf, on="contact_id", how="inner", **{_JOIN_NULLS_KW: True})
+        .filter(pl.col("call_start_time") >= pl.col("created_time"))
+        .group_by("_row")
+        .agg(pl.len().alias("calls_cnt"))
+    )
+
+    stage = pl.col("stage").cast(pl.Utf8).str.to_lowercase()
+    is_paid = stage.str.contains("payment done", literal=True).fill_null(False)
+    df = (
+        deals_lf.join(calls_by_deal, on="_row", how="left")
+        .with_columns(
+            pl.col("calls_cnt").fill_null(0),
+            is_paid.alias("is_paid"),
+            pl.col("closing_date").is_not_null().alias("is_closed"),
+            (stage.str.contains("lost", literal=True).fill_null(False) & ~is_paid).alias("is_lost"),
+            pl.when(is_paid).then(pl.col("offer_total").fill_null(0)).otherwise(0.0).alias("revenue_manager"),
+            pl.col("SLA").cast(pl.Float64, strict=False).alias("lead_to_first_call_hours"),
+        )
+        .with_columns((pl.col("calls_cnt") > 0).alias("has_call"))
+        .with_columns((pl.col("is_closed") | pl.col("has_call")).alias("is_processed"))
+    )
+    if month:
+        df = df.filter(pl.col("month") == month)
+
+    owners_lf = (
+        df.group_by("deal_owner")
+        .agg(
+            pl.col("deal_id").count().alias("n_deals"),
+            pl.col("is_processed").sum().alias("n_processed"),
+            pl.col("is_closed").sum().alias("n_closed"),
+            pl.col("is_paid").sum().alias("n_paid"),
+            pl.col("is_lost").sum().alias("n_lost"),
+            pl.col("revenue_manager").sum().alias("revenue_won"),
+            pl.col("calls_cnt").sum().alias("calls_cnt_total"),
+            pl.col("has_call").sum().alias("n_processed_with_calls"),
+            pl.col("lead_to_first_call_hours").mean().alias("avg_lead_to_first_call_hours"),
+        )
+        .sort("deal_owner", nulls_last=True)
+    )
+    lost_lf = (
+        df.filter(pl.col("is_lost"))
+        .group_by("deal_owner", "lost_reason")
+        .agg(pl.col("deal_id").count().alias("n_lost"))
+        .sort("deal_owner", "lost_reason", nulls_last=True)
+    )
+    owners_pl, lost_pl = pl.collect_all([owners_lf, lost_lf])
 
+    owners = _add_owner_ratios(owners_pl.to_pandas())
+    lost_reason_by_owner = _add_lost_shares(lost_pl.to_pandas())
     return {"owners": owners, "lost_reason_by_owner": lost_reason_by_owner}
@@ -6,44 +6,26 @@
 - Распределение time-to-close (дней).
 """
 
-from pathlib import Path
 from typing import Tuple, Optional, Dict
 
 import numpy as np
 import pandas as pd
 
-try:
-    from .io import CLEAN_DIR  # type: ignore
-except Exception:
-    CLEAN_DIR = Path(__file__).resolve().parents[1] / "data" / "clean"
+from .io import read_clean
 
-
-def _load_table(name: str) -> pd.DataFrame:
-    """
-    Загружает таблицу из data/clean: сперва Parquet, затем CSV (если паркет недоступен).
-    """
-    base = Path(CLEAN_DIR)
-    p_parquet = base / f"{name}.parquet"
-    if p_parquet.exists():
-        try:
-            return pd.read_parquet(p_parquet)
-        except Exception:
-            pass
-    p_csv = base / f"{name}.csv"
-    if p_csv.exists():
-        return pd.read_csv(p_csv)
-    raise FileNotFoundError(f"Не найден файл для набора {name} в {base}")
+# Известные имена колонки длительности звонка (до поиска по подстроке 'duration').
+_DUR_CANDIDATES = ("Call Duration (in seconds)", "call_duration", "duration")
 
 
 def load_deals_calls() -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Загрузить Deals/Calls из data/clean (Parquet) и привести даты.
     """
-    deals = _load_table("Deals").rename(columns={
+    deals = read_clean("Deals").rename(columns={
         "Created Time": "created_time",
         "Closing Date": "closing_date",
     })
-    calls = _load_table("Calls").rename(columns={
+    calls = read_clean("Calls").rename(columns={
         "Call Start Time": "call_start_time",
     })
     deals["created_time"] = pd.to_datetime(deals["created_time"], errors="coerce")
@@ -52,18 +34,40 @@ def load_deals_calls() -> Tuple[pd.DataFrame, pd.DataFrame]:
     return deals, calls
 
 
+def _day_ordinals(values: pd.Series) -> np.ndarray:
+    """
+    Номера суток от эпохи (int64) для непустых дат.
+    """
+    arr = values.to_numpy(dtype="datetime64[ns]")
+    return arr[~np.isnat(arr)].astype("datetime64[D]").astype("int64")
+
+
 def make_daily_series(deals: pd.DataFrame, calls: pd.DataFrame) -> pd.DataFrame:
     """
     Ежедневные counts: deals_created, calls_total и конверсия сделок (%).
     """
-    deals_daily = (
-        deals.set_index("created_time").resample("D").size().rename("deals_created").reset_index()
-    ).rename(columns={"created_time": "date"})
-    calls_daily = (
-        calls.set_index("call_start_time").resample("D").size().rename("calls_total").reset_index()
-    ).rename(columns={"call_start_time": "date"})
-    daily = pd.merge(deals_daily, calls_daily, on="date", how="outer").fillna(0)
-    daily = daily.sort_values("date").reset_index(drop=True)
+    deal_days = _day_ordinals(deals["created_time"])
+    call_days = _day_ordinals(calls["call_start_time"])
+    spans = [(d.min(), d.max()) for d in (deal_days, call_days) if d.size]
+    if not spans:
+        return pd.DataFrame(columns=["date", "deals_created", "calls_total", "deal_rate_pct"])
+
+    start = min(lo for lo, _ in spans)
+    days = np.arange(start, max(hi for _, hi in spans) + 1)
+    deals_created = np.bincount(deal_days - start, minlength=days.size)
+    calls_total = np.bincount(call_days - start, minlength=days.size)
+    # Как outer merge двух дневных рядов: оставляем дни из диапазона хотя бы одного из них.
+    keep = np.zeros(days.size, dtype=bool)
+    for lo, hi in spans:
+        keep |= (days >= lo) & (days <= hi)
+
+    daily = pd.DataFrame(
+        {
+            "date": days[keep].astype("datetime64[D]").astype("datetime64[ns]"),
+            "deals_created": deals_created[keep],
+            "calls_total": calls_total[keep],
+        }
+    )
     daily["deal_rate_pct"] = np.where(
         daily["calls_total"] > 0,
         (daily["deals_created"] / daily["calls_total"]) * 100.0,
@@ -77,14 +81,23 @@ def make_closed_daily(deals: pd.DataFrame, upper: pd.Timestamp | None = None) ->
     Ежедневные закрытия; отбрасываем аномалии closing_date < created_time.
     Если указана верхняя граница `upper`, дополнительно фильтруем даты > upper.
     """
-    # Берём только записи, где обе даты заданы
-    valid = deals.dropna(subset=["closing_date", "created_time"]).copy()
-    # Отбрасываем технически невозможные случаи: закрытие раньше создания
-    valid = valid[valid["closing_date"] >= valid["created_time"]]
-
-    cd = (
-        valid.set_index("closing_date").resample("D").size()
-        .rename("deals_closed").reset_index()
+    closing = deals["closing_date"].to_numpy(dtype="datetime64[ns]")
+    created = deals["created_time"].to_numpy(dtype="datetime64[ns]")
+    # Берём только записи, где обе даты заданы, и отбрасываем закрытие раньше создания
+    keep = ~np.isnat(closing) & ~np.isnat(created) & (closing >= created)
+    days = closing[keep].astype("datetime64[D]").astype("int64")
+    if days.size == 0:
+        return pd.DataFrame(
+            {"closing_date": pd.Series(dtype="datetime64[ns]"), "deals_closed": pd.Series(dtype="int64")}
+        )
+
+    start = days.min()
+    counts = np.bincount(days - start)
+    cd = pd.DataFrame(
+        {
+            "closing_date": (start + np.arange(counts.size)).astype("datetime64[D]").astype("datetime64[ns]"),
+            "deals_closed": counts,
+        }
     )
     if upper is not None:
         cd = cd[cd["closing_date"] <= upper]
@@ -104,30 +117,41 @@ def make_ttc_series(deals: pd.DataFrame) -> pd.Series:
 def calls_duration_stats(calls: pd.DataFrame) -> Optional[Dict[str, float]]:
     """
     Быстрая сводка по длительности звонков (в секундах и минутах): медиана и 90-й перцентиль.
-    Ищет колонку по подстроке 'duration'. Возвращает None, если колонка не найдена или нет данных.
+    Колонку берёт из _DUR_CANDIDATES, иначе ищет по подстроке 'duration'. Возвращает None, если колонка не найдена или нет данных.
     """
-    dur_col = None
-    for c in calls.columns:
-        if "duration" in str(c).lower():
-            dur_col = c
-            break
+    dur_col = next((c for c in _DUR_CANDIDATES if c in calls.columns), None)
+    if dur_col is None:
+        dur_col = next((c for c in calls.columns if "duration" in str(c).lower()), None)
     if dur_col is None:
         return None
-    dur = pd.to_numeric(calls[dur_col], errors="coerce").dropna()
-    dur = dur[dur >= 0]
-    if dur.empty:
+    arr = pd.to_numeric(calls[dur_col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    arr = arr[~np.isnan(arr) & (arr >= 0)]
+    if arr.size == 0:
         return None
-    med_s = float(dur.median())
-    p90_s = float(dur.quantile(0.90))
+    med_s, p90_s = _quantiles_partition(arr, (0.5, 0.90))
     return {
         "med_s": med_s,
         "p90_s": p90_s,
         "med_m": med_s / 60.0,
         "p90_m": p90_s / 60.0,
-        "n": float(len(dur)),
+        "n": float(arr.size),
     }
 
 
+def _quantiles_partition(arr: np.ndarray, qs: Tuple[float, ...]) -> Tuple[float, ...]:
+    """
+    Квантили с линейной интерполяцией (как pandas.quantile) через np.partition за O(N) вместо сортировки.
+    """
+    pos = [q * (arr.size - 1) for q in qs]
+    kth = sorted({int(np.floor(p)) for p in pos} | {int(np.ceil(p)) for p in pos})
+    part = np.partition(arr, kth)
+    out = []
+    for p in pos:
+        lo, hi = int(np.floor(p)), int(np.ceil(p))
+        out.append(float(part[lo] + (part[hi] - part[lo]) * (p - lo)))
+    return tuple(out)
+
+
 def ttc_hist_counts(valid: pd.Series,
                     bins: Optional[list] = None,
                     labels: Optional[list] = None) -> pd.Series:
@@ -141,8 +165,15 @@ def ttc_hist_counts(valid: pd.Series,
         bins = [-0.001, 3, 7, 14, 30, 60, 120, 365]
     if labels is None:
         labels = ["0-3", "4-7", "8-14", "15-30", "31-60", "61-120", "121-365"]
-    binned = pd.cut(valid, bins=bins, labels=labels, include_lowest=True, right=True)
-    return binned.value_counts().sort_index()
+    edges = np.asarray(bins, dtype=np.float64)
+    arr = valid.to_numpy(dtype=np.float64)
+    # Корзины (b[i], b[i+1]], первая включает левую границу - как pd.cut(right=True, include_lowest=True).
+    idx = np.searchsorted(edges, arr, side="left") - 1
+    idx[arr == edges[0]] = 0
+    idx = idx[(idx >= 0) & (idx < edges.size - 1)]
+    counts = np.bincount(idx, minlength=edges.size - 1)
+    index = pd.CategoricalIndex(labels, categories=labels, ordered=True)
+    return pd.Series(counts, index=index, dtype="int64", name="count")
 
 
 def overall_period_and_conversion(daily: pd.DataFrame) -> Optional[Dict[str, object]]:
@@ -1,18 +1,41 @@
 from __future__ import annotations
 
+import math
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
 import numpy as np
 import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+try:
+    from numba import njit  # type: ignore
+except ImportError:  # numba - необязательная зависимость, без нее ядро A/B-теста работает как обычная функция
+    njit = None
 
 try:
     from .io import CLEAN_DIR  # type: ignore
 except Exception:
     CLEAN_DIR = Path(__file__).resolve().parents[1] / "data" / "clean"
 
+_UE_TABLES = ["Deals", "Contacts", "Calls", "Spend"]
+# Колонки, которые реально используются в расчетах UE (остальные не читаются с диска).
+_UE_COLUMNS = {
+    "Deals": [
+        "Id", "Stage", "Product", "Created Time", "Contact Name", "Offer Total Amount",
+        "Months of study", "Course duration", "Initial Amount Paid",
+    ],
+    "Contacts": ["Id"],
+    "Calls": ["CONTACTID"],
+    "Spend": ["Date", "Spend"],
+}
+_CLOSED_STAGE = "payment done"
+_MIN_CLOSED_AMOUNT = 10
 _PRODUCTS = ["Web Developer", "Digital Marketing", "UX/UI Design"]
 _GROWTH_LEVERS = ["UA", "C1", "CPA", "AOV", "APC"]
+_GROWTH_MULTIPLIERS = np.array([1.10, 1.10, 0.90, 1.10, 1.10])  # по порядку _GROWTH_LEVERS
 _HADI_ROWS = [
     {
         "Часть": "H (гипотеза)",
@@ -56,72 +79,132 @@ _HADI_ROWS = [
 ]
 
 
-def _load_table(name: str) -> pd.DataFrame:
+def _load_table(name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
     """
-    Читает parquet-таблицу из data/clean по имени набора.
+    Читает parquet-таблицу из data/clean по имени набора: многопоточное чтение через pyarrow.dataset,
+    только нужные колонки (отсутствующие в файле пропускаются).
     """
     path = Path(CLEAN_DIR) / f"{name}.parquet"
     if not path.exists():
         raise FileNotFoundError(f"Не найден файл: {path}")
-    return pd.read_parquet(path)
+    dataset = ds.dataset(path, format="parquet")
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    table = dataset.to_table(columns=columns, use_threads=True)
+    return table.to_pandas(self_destruct=True, split_blocks=True)
 
 
-def load_ue_tables() -> Dict[str, pd.DataFrame]:
+def _load_deals_closed() -> pd.DataFrame:
     """
-    Загружает Deals/Contacts/Calls/Spend из data/clean.
+    Оплаченные сделки (Stage == payment done, Offer Total Amount > 10) с фильтром на уровне сканирования parquet:
+    row groups, не проходящие по статистикам, не декодируются.
     """
-    names = ["Deals", "Contacts", "Calls", "Spend"]
-    return {name.lower(): _load_table(name) for name in names}
+    path = Path(CLEAN_DIR) / "Deals.parquet"
+    if not path.exists():
+        raise FileNotFoundError(f"Не найден файл: {path}")
+    dataset = ds.dataset(path, format="parquet")
+    columns = [c for c in _UE_COLUMNS["Deals"] if c in dataset.schema.names]
+    condition = (pc.field("Stage") == _CLOSED_STAGE) & (pc.field("Offer Total Amount") > _MIN_CLOSED_AMOUNT)
+    table = dataset.to_table(columns=columns, filter=condition, use_threads=True)
+    return table.to_pandas(self_destruct=True, split_blocks=True)
 
 
-def _calc_r_i(row: pd.Series) -> pd.Series:
+def _filter_closed(deals: pd.DataFrame) -> pd.DataFrame:
     """
-    Считает AOV_I и R_I для конкретной сделки.
+    Тот же отбор оплаченных сделок для таблиц, переданных в памяти.
     """
-    months = row["months_of_study"]
-    duration = row["course_duration"]
-    total = row["offer_total_amount"]
-    initial = row["initial_amount_paid"]
-
-    if pd.isna(months) or pd.isna(duration) or pd.isna(total) or months <= 0 or duration <= 0:
-        return pd.Series({"aov_i": np.nan, "r_i": np.nan})
+    mask = (deals["Stage"] == _CLOSED_STAGE) & (deals["Offer Total Amount"].fillna(0) > _MIN_CLOSED_AMOUNT)
+    return deals[mask.to_numpy()]
 
-    if total - initial > 0 and duration > 1:
-        monthly_tail = (total - initial) / (duration - 1)
-        numerator = initial + max(months - 1, 0) * monthly_tail
-        aov_i = numerator / months if months else np.nan
-    else:
-        aov_i = total / duration
 
-    r_i = aov_i * months if pd.notna(aov_i) else np.nan
-    return pd.Series({"aov_i": aov_i, "r_i": r_i})
+def load_ue_tables() -> Dict[str, pd.DataFrame]:
+    """
+    Загружает Deals/Contacts/Calls/Spend из data/clean (только колонки, нужные для UE).
+    """
+    return {name.lower(): _load_table(name, _UE_COLUMNS[name]) for name in _UE_TABLES}
 
 
 def _unique(series: pd.Series) -> float:
     """
     Возвращает число уникальных значений в колонке как float.
+    Строковые колонки (после очистки это все ID) считаются напрямую, без приведения к "string".
     """
+    if pd.api.types.is_string_dtype(series):
+        return float(series.nunique(dropna=True))
     return float(series.astype("string").nunique(dropna=True))
 
 
+def _tables_mtime() -> Tuple[float, ...]:
+    """
+    mtime parquet-файлов UE-таблиц - ключ кэша контекста (после переочистки данных кэш не устаревает).
+    """
+    paths = [Path(CLEAN_DIR) / f"{name}.parquet" for name in _UE_TABLES]
+    return tuple(path.stat().st_mtime if path.exists() else 0.0 for path in paths)
+
+
+@lru_cache(maxsize=1)
+def _prepare_context_cached(mtime: Tuple[float, ...]) -> Dict[str, object]:
+    """
+    Контекст по таблицам из data/clean; считается один раз на набор mtime.
+    """
+    return _build_context(load_ue_tables(), closed_deals=_load_deals_closed())
+
+
+def clear_cache() -> None:
+    """
+    Сбрасывает кэш контекста юнит-экономики.
+    """
+    _prepare_context_cached.cache_clear()
+
+
 def _prepare_context(tables: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, object]:
+    """
+    Контекст для публичных функций: без tables берется из кэша, наружу отдаются
+    неглубокие копии таблиц и словарей, чтобы вызывающий код не менял закэшированное.
+    """
+    if tables:
+        return _build_context(tables)
+    ctx = _prepare_context_cached(_tables_mtime())
+    return {
+        "tables": dict(ctx["tables"]),
+        "metrics": ctx["metrics"].copy(deep=False),
+        "product_metrics": ctx["product_metrics"].copy(deep=False),
+        "segments": {segment: dict(data) for segment, data in ctx["segments"].items()},
+    }
+
+
+def _build_context(
+    tables: Dict[str, pd.DataFrame],
+    closed_deals: Optional[pd.DataFrame] = None,
+) -> Dict[str, object]:
     """
     Строит базовые таблицы, метрики и сегменты для повторного использования.
+    closed_deals - уже отфильтрованные оплаченные сделки (если нет, отбираются из tables["deals"]).
     """
-    tables = tables or load_ue_tables()
-    deals = tables["deals"].copy()
+    deals = tables["deals"]
     spend = tables["spend"]
     contacts = tables["contacts"]
     calls = tables["calls"]
 
-    closed_deals = deals[deals["Stage"] == "payment done"].copy()
-    closed_deals = closed_deals[closed_deals["Offer Total Amount"].fillna(0) > 10].copy()
-
-    closed_deals["months_of_study"] = closed_deals["Months of study"]
-    closed_deals["course_duration"] = closed_deals["Course duration"]
-    closed_deals["initial_amount_paid"] = closed_deals["Initial Amount Paid"].fillna(0)
-    closed_deals["offer_total_amount"] = closed_deals["Offer Total Amount"].fillna(0)
-    closed_deals[["aov_i", "r_i"]] = closed_deals.apply(_calc_r_i, axis=1)
+    if closed_deals is None:
+        closed_deals = _filter_closed(deals)
+
+    # AOV_I и R_I по сделкам - векторно по исходным колонкам (без копий и колонок-псевдонимов).
+    m = closed_deals["Months of study"].to_numpy(dtype="float64", na_value=np.nan)
+    d = closed_deals["Course duration"].to_numpy(dtype="float64", na_value=np.nan)
+    t = np.nan_to_num(closed_deals["Offer Total Amount"].to_numpy(dtype="float64", na_value=np.nan))
+    i0 = np.nan_to_num(closed_deals["Initial Amount Paid"].to_numpy(dtype="float64", na_value=np.nan))
+    valid = ~np.isnan(m) & ~np.isnan(d) & ~np.isnan(t) & (m > 0) & (d > 0)
+    branch1 = (t - i0 > 0) & (d > 1)
+    monthly_tail = np.where(branch1, (t - i0) / np.where(d > 1, d - 1, 1), 0.0)
+    num = i0 + np.maximum(m - 1, 0) * monthly_tail
+    aov = np.where(branch1, num / np.where(m > 0, m, 1), t / np.where(d > 0, d, 1))
+    aov = np.where(valid, aov, np.nan)
+    # Узкая рабочая таблица вместо добавления колонок в срез deals.
+    closed = pd.DataFrame(
+        {"Id": closed_deals["Id"], "Product": closed_deals["Product"], "months_of_study": m, "r_i": aov * m},
+        index=closed_deals.index,
+    )
 
     ua_candidates: List[float] = []
     if "Contact Name" in deals.columns:
@@ -133,10 +216,10 @@ def _prepare_context(tables: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[s
 
     ua = max(ua_candidates) if ua_candidates else float("nan")
 
-    buyers = closed_deals["Id"].nunique()
+    buyers = closed["Id"].nunique()
     ac = float(spend["Spend"].sum())
-    transactions = float(closed_deals["months_of_study"].fillna(0).sum())
-    revenue = float(closed_deals["r_i"].sum())
+    transactions = float(closed["months_of_study"].sum())
+    revenue = float(closed["r_i"].sum())
 
     c1 = buyers / ua if ua else np.nan
     c1_pct = c1 * 100 if pd.notna(c1) else np.nan
@@ -166,41 +249,41 @@ def _prepare_context(tables: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[s
         }
     ).to_frame(name="value").round(2)
 
-    product_rows = []
-    for product in _PRODUCTS:
-        deals_product = deals[deals["Product"] == product]
-        closed_product = closed_deals[closed_deals["Product"] == product]
-
-        buyers_product = closed_product["Id"].nunique()
-        transactions_product = float(closed_product["months_of_study"].fillna(0).sum())
-        revenue_product = float(closed_product["r_i"].sum())
-        c1_product = buyers_product / ua if ua else np.nan
-        c1_pct_product = c1_product * 100 if pd.notna(c1_product) else np.nan
-        aov_product = revenue_product / transactions_product if transactions_product else np.nan
-        apc_product = transactions_product / buyers_product if buyers_product else np.nan
-        cltv_product = aov_product * apc_product if pd.notna(aov_product) and pd.notna(apc_product) else np.nan
-        ltv_product = cltv_product * c1_product if pd.notna(cltv_product) and pd.notna(c1_product) else np.nan
-        cm_product = ua * (ltv_product - cpa) if pd.notna(ltv_product) and pd.notna(cpa) else np.nan
-
-        product_rows.append(
-            {
-                "Product": product,
-                "UA": ua,
-                "B": buyers_product,
-                "AC": ac,
-                "T": transactions_product,
-                "Revenue": revenue_product,
-                "C1": c1_pct_product,
-                "CPA": cpa,
-                "AOV": aov_product,
-                "APC": apc_product,
-                "CLTV": cltv_product,
-                "LTV": ltv_product,
-                "CM": cm_product,
-            }
-        )
+    # Срез по продуктам - одна группировка вместо фильтрации в цикле по каждому продукту.
+    by_product = (
+        closed.groupby("Product", observed=True, sort=False)
+        .agg(B=("Id", "nunique"), T=("months_of_study", "sum"), Revenue=("r_i", "sum"))
+        .reindex(pd.Index(_PRODUCTS, name="Product"), fill_value=0)
+    )
+    buyers_product = by_product["B"]
+    transactions_product = by_product["T"].astype("float64")
+    revenue_product = by_product["Revenue"].astype("float64")
+    if ua:
+        c1_product = buyers_product / ua
+    else:
+        c1_product = pd.Series(np.nan, index=by_product.index)
+    aov_product = revenue_product / transactions_product.where(transactions_product != 0)
+    apc_product = transactions_product / buyers_product.where(buyers_product != 0)
+    cltv_product = aov_product * apc_product
+    ltv_product = cltv_product * c1_product
 
-    product_metrics_df = pd.DataFrame(product_rows).set_index("Product").round(2)
+    product_metrics_df = pd.DataFrame(
+        {
+            "UA": ua,
+            "B": buyers_product,
+            "AC": ac,
+            "T": transactions_product,
+            "Revenue": revenue_product,
+            "C1": c1_product * 100,
+            "CPA": cpa,
+            "AOV": aov_product,
+            "APC": apc_product,
+            "CLTV": cltv_product,
+            "LTV": ltv_product,
+            "CM": ua * (ltv_product - cpa),
+        },
+        index=by_product.index,
+    ).round(2)
 
     segments: Dict[str, Dict[str, float]] = {
         "Business": {
@@ -233,10 +316,8 @@ def _prepare_context(tables: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[s
 
 def _compute_cm(ua_value, c1_value, cpa_value, aov_value, apc_value):
     """
-    Считаем CM по заданным значениям UA/C1/CPA/AOV/APC.
+    Считаем CM по заданным значениям UA/C1/CPA/AOV/APC (скаляры или массивы, NaN распространяется).
     """
-    if any(pd.isna(x) for x in [ua_value, c1_value, cpa_value, aov_value, apc_value]):
-        return np.nan
     cltv_value = aov_value * apc_value
     ltv_value = cltv_value * c1_value
     return ua_value * (ltv_value - cpa_value)
@@ -244,71 +325,93 @@ def _compute_cm(ua_value, c1_value, cpa_value, aov_value, apc_value):
 
 def _growth_table(segments: Dict[str, Dict[str, float]]) -> pd.DataFrame:
     """
-    Формирует таблицу сценариев изменения CM для всех сегментов.
+    Формирует таблицу сценариев изменения CM для всех сегментов:
+    матрица (сегмент x рычаг x параметр) с диагональными множителями, CM считается одним проходом.
     """
-    rows = []
-    for segment, data in segments.items():
-        base_cm = data["CM"]
-        for lever in _GROWTH_LEVERS:
-            ua_adj = data["UA"]
-            c1_adj = data["C1"]
-            cpa_adj = data["CPA"]
-            aov_adj = data["AOV"]
-            apc_adj = data["APC"]
-
-            if lever == "UA":
-                ua_adj *= 1.10
-            elif lever == "C1":
-                c1_adj *= 1.10
-            elif lever == "CPA":
-                cpa_adj *= 0.90
-            elif lever == "AOV":
-                aov_adj *= 1.10
-            elif lever == "APC":
-                apc_adj *= 1.10
-
-            new_cm = _compute_cm(ua_adj, c1_adj, cpa_adj, aov_adj, apc_adj)
-            rows.append(
-                {
-                    "Segment": segment,
-                    "Metric": lever,
-                    "CM_base": base_cm,
-                    "CM_new": new_cm,
-                    "CM_delta": new_cm - base_cm if pd.notna(base_cm) else np.nan,
-                    "CM_delta_%": ((new_cm / base_cm) - 1) * 100 if base_cm else np.nan,
-                }
-            )
-
-    return pd.DataFrame(rows).round(2)
+    names = list(segments)
+    base = np.array(
+        [[segments[name][lever] for lever in _GROWTH_LEVERS] for name in names], dtype="float64"
+    ).reshape(-1, len(_GROWTH_LEVERS))
+    base_cm = np.array([segments[name]["CM"] for name in names], dtype="float64")
+
+    mult = np.ones((len(_GROWTH_LEVERS), len(_GROWTH_LEVERS)))
+    np.fill_diagonal(mult, _GROWTH_MULTIPLIERS)
+    adjusted = base[:, None, :] * mult[None, :, :]
+    cm_new = _compute_cm(*(adjusted[..., i] for i in range(len(_GROWTH_LEVERS)))).ravel()
+
+    cm_base = np.repeat(base_cm, len(_GROWTH_LEVERS))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_pct = np.where(cm_base != 0, (cm_new / cm_base - 1) * 100, np.nan)
+
+    return pd.DataFrame(
+        {
+            "Segment": np.repeat(names, len(_GROWTH_LEVERS)).astype(object),
+            "Metric": np.tile(_GROWTH_LEVERS, len(names)).astype(object),
+            "CM_base": cm_base,
+            "CM_new": cm_new,
+            "CM_delta": cm_new - cm_base,
+            "CM_delta_%": delta_pct,
+        }
+    ).round(2)
 
 
 def _ua_daily_counts(deals: pd.DataFrame) -> Dict[str, float]:
     """
-    Считаем средний показатель UA в день для бизнеса и каждого сегмента продукта.
-    """
-    deals_copy = deals.copy()
-    deals_copy["Created Time"] = pd.to_datetime(deals_copy["Created Time"], errors="coerce")
-    deals_copy["created_day"] = deals_copy["Created Time"].dt.normalize()
-
-    def calc(df: pd.DataFrame) -> float:
-        if df.empty or "Contact Name" not in df.columns:
-            return float("nan")
-        ua_total = _unique(df["Contact Name"])
-        dates = df["created_day"].dropna()
-        if dates.empty or not ua_total:
-            return float("nan")
-        days_span = (dates.max() - dates.min()).days + 1
-        if days_span <= 0:
-            return float("nan")
-        return ua_total / days_span
-
-    counts: Dict[str, float] = {"Business": calc(deals_copy)}
-    for product in _PRODUCTS:
-        product_df = deals_copy[deals_copy["Product"] == product]
-        counts[product] = calc(product_df)
+    Считаем средний показатель UA в день для бизнеса и каждого сегмента продукта
+    (уникальные контакты и границы дат по продуктам - одной группировкой, без копии deals).
+    """
+    counts: Dict[str, float] = {name: float("nan") for name in ["Business", *_PRODUCTS]}
+    if deals.empty or "Contact Name" not in deals.columns:
+        return counts
+
+    days = pd.to_datetime(deals["Created Time"], errors="coerce").dt.normalize()
+    tmp = pd.DataFrame({"p": deals["Product"], "c": deals["Contact Name"], "d": days})
+    agg = (
+        tmp.groupby("p", observed=True)
+        .agg(n=("c", "nunique"), dmin=("d", "min"), dmax=("d", "max"))
+        .reindex(_PRODUCTS)
+    )
+    agg.loc["Business"] = [_unique(tmp["c"]), days.min(), days.max()]
+
+    # Если все даты пустые, строка Business с NaT делает столбцы object - возвращаем им тип datetime
+    span = (pd.to_datetime(agg["dmax"]) - pd.to_datetime(agg["dmin"])).dt.days + 1
+    per_day = agg["n"].where(agg["n"] > 0) / span.where(span > 0)
+    counts.update({name: float(value) for name, value in per_day.items()})
     return counts
 
 
+def _ab_kernel(
+    p: float, ua_per_day: float, target: float, max_days: float
+) -> Tuple[float, float, float, float, float, float]:
+    """
+    Ядро расчета A/B-теста C1 на чистых float (NaN распространяется, некорректные случаи дают NaN):
+    x_abs, n_available, x_mde, n_per_group, days_required, min_ua_per_day.
+    """
+    nan = math.nan
+    x_abs = target - p
+    var = 16.0 * p * (1.0 - p)
+    if ua_per_day > 0:
+        n_available = ua_per_day * max_days
+        ratio = var / n_available
+        x_mde = math.sqrt(ratio) if ratio >= 0 else nan
+    else:
+        n_available = nan
+        x_mde = nan
+    if x_abs > 0:
+        n_per_group = var / (x_abs * x_abs)
+        days_required = n_per_group / ua_per_day if ua_per_day > 0 else nan
+        min_ua_per_day = n_per_group / max_days if max_days else nan
+    else:
+        n_per_group = nan
+        days_required = nan
+        min_ua_per_day = nan
+    return x_abs, n_available, x_mde, n_per_group, days_required, min_ua_per_day
+
+
+if njit is not None:
+    # Нативная версия ядра - для переборов параметров (например, target по сетке).
+    _ab_kernel = njit(cache=True)(_ab_kernel)
+
 
 def _experiment_scope(segments: Dict[str, Dict[str, float]], deals: pd.DataFrame) -> list[Dict[str, float]]:
     """
@@ -323,29 +426,15 @@ def _experiment_scope(segments: Dict[str, Dict[str, float]], deals: pd.DataFrame
     for segment, data in segments.items():
         p_base = data.get("C1")
         ua_base = data.get("UA")
-        x_abs = (effect_target - p_base) if pd.notna(p_base) else np.nan
         ua_per_day = ua_daily.get(segment)
 
-        if pd.isna(ua_per_day) or ua_per_day <= 0:
-            n_available = np.nan
-        else:
-            n_available = ua_per_day * max_days
-
-        if pd.notna(p_base) and pd.notna(n_available) and n_available > 0:
-            x_mde = float(np.sqrt((16 * p_base * (1 - p_base)) / n_available))
-        else:
-            x_mde = np.nan
-
-        if pd.isna(p_base) or pd.isna(ua_base) or pd.isna(x_abs) or x_abs <= 0:
-            n_per_group = np.nan
-            days_required = np.nan
-            min_ua_per_day = np.nan
-            fits_limit = False
-        else:
-            n_per_group = (16 * p_base * (1 - p_base)) / (x_abs ** 2)
-            days_required = (n_per_group / ua_per_day) if ua_per_day and not pd.isna(ua_per_day) else np.nan
-            min_ua_per_day = (n_per_group / max_days) if max_days else np.nan
-            fits_limit = bool(days_required <= max_days) if pd.notna(days_required) else False
+        p_value = float(p_base) if pd.notna(p_base) else math.nan
+        ua_value = float(ua_per_day) if pd.notna(ua_per_day) else math.nan
+        x_abs, n_available, x_mde, n_per_group, days_required, min_ua_per_day = _ab_kernel(
+            p_value, ua_value, effect_target, float(max_days)
+        )
+        if pd.isna(ua_base):
+            n_per_group = days_required = min_ua_per_day = math.nan
 
         rows.append(
             {
@@ -358,7 +447,7 @@ def _experiment_scope(segments: Dict[str, Dict[str, float]], deals: pd.DataFrame
                 "n_available": n_available,
                 "days_required": days_required,
                 "min_ua_per_day": min_ua_per_day,
-                "fits_limit": fits_limit,
+                "fits_limit": bool(days_required <= max_days),
                 "x_mde": x_mde,
                 "max_days": max_days,
             }
@@ -367,19 +456,27 @@ def _experiment_scope(segments: Dict[str, Dict[str, float]], deals: pd.DataFrame
     return rows
 
 
-def unit_economics_tables() -> Tuple[pd.DataFrame, pd.DataFrame]:
+def context() -> Dict[str, object]:
+    """
+    Готовый контекст юнит-экономики (таблицы, метрики, сегменты) из кэша процесса.
+    Получите его один раз и передавайте как ctx в функции ниже.
+    """
+    return _prepare_context()
+
+
+def unit_economics_tables(ctx: Optional[Dict[str, object]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Таблицы для юнит-экономики: общий бизнес + срез по продуктам.
     """
-    ctx = _prepare_context()
+    ctx = ctx or context()
     return ctx["metrics"], ctx["product_metrics"]
 
 
-def growth_scenarios_table() -> pd.DataFrame:
+def growth_scenarios_table(ctx: Optional[Dict[str, object]] = None) -> pd.DataFrame:
     """
     Таблица сценариев роста CM при изменении UA/C1/CPA/AOV/APC на ±10%.
     """
-    ctx = _prepare_context()
+    ctx = ctx or context()
     return _growth_table(ctx["segments"])
 
 
@@ -390,9 +487,9 @@ def hadi_table() -> pd.DataFrame:
     return pd.DataFrame(_HADI_ROWS)
 
 
-def hypothesis_check_info() -> list[Dict[str, float]]:
+def hypothesis_check_info(ctx: Optional[Dict[str, object]] = None) -> list[Dict[str, float]]:
     """
     Возвращает параметры проверки C1 по всему бизнесу и сегментам.
     """
-    ctx = _prepare_context()
+    ctx = ctx or context()
     return _experiment_scope(ctx["segments"], ctx["tables"]["deals"])
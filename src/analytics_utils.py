@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def safe_div(num: pd.Series, den: pd.Series) -> np.ndarray:
+    """
+    Безопасное деление столбцов (деление на ноль и пропуски заменяем на 0).
+    """
+    n = np.asarray(num, dtype=np.float64)
+    d = np.asarray(den, dtype=np.float64)
+    out = np.zeros_like(n)
+    np.divide(n, d, out=out, where=(d != 0) & ~np.isnan(n) & ~np.isnan(d))
+    return out
+
+
+def stage_masks(stage: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Маски is_paid/is_lost за один проход: lower/подстроки считаются по словарю стадий (десятки значений),
+    а строки размечаются индексацией булевой таблицы по кодам категорий.
+    """
+    if isinstance(stage.dtype, pd.CategoricalDtype):
+        codes, cats = stage.cat.codes.to_numpy(), stage.cat.categories
+    else:
+        codes, cats = pd.factorize(stage)
+    lowered = pd.Index(cats).astype(str).str.lower()
+    # Код -1 (пропуск) указывает на последний элемент таблицы - False.
+    paid_cats = np.append(np.asarray(lowered.str.contains("payment done", regex=False), dtype=bool), False)
+    lost_cats = np.append(np.asarray(lowered.str.contains("lost", regex=False), dtype=bool), False) & ~paid_cats
+    return paid_cats[codes], lost_cats[codes]
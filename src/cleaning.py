@@ -10,15 +10,29 @@
 
 from __future__ import annotations
 
-import json
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional, Sequence, Any
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 from . import io as srs_io
 
+# Rust-движок чтения xlsx (python-calamine), если установлен; иначе pandas берет openpyxl.
+try:
+    import python_calamine  # type: ignore  # noqa: F401
+    _EXCEL_ENGINE: Optional[str] = "calamine"
+except ImportError:
+    _EXCEL_ENGINE = None
+
+# Строки храним в Arrow-буфере: .str.strip и нормализация текста идут через векторные ядра
+# pyarrow.compute (utf8_trim_whitespace, utf8_lower и т.д.), без Python-объекта на ячейку.
+_STRING_DTYPE = pd.StringDtype("pyarrow")
+
 
 def safe_print(msg: str) -> None:
     """
@@ -33,49 +47,58 @@ def safe_print(msg: str) -> None:
 
 def drop_all_null_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Удаляет столбцы, где все значения NaN.
+    Удаляет столбцы, где все значения NaN. Если удалять нечего, возвращает тот же кадр без копии.
     """
-    return df.dropna(axis=1, how="all")
+    empty = df.columns[df.isna().all().to_numpy()]
+    if empty.empty:
+        return df
+    return df.drop(columns=empty)
 
 
 def drop_duplicate_rows(df: pd.DataFrame, subset: Optional[Sequence[str]] = None) -> pd.DataFrame:
     """
     Удаляет дубликаты строк (если задан subset - по указанным столбцам).
+    Строки отбираются через take: результат - самостоятельный кадр без ссылки на исходный, поэтому
+    присваивания столбцов дальше в clean_* не дают SettingWithCopyWarning, пока вызывающий держит исходник.
     """
-    return df.drop_duplicates(subset=subset, keep="first")
+    return df.take(np.flatnonzero(~df.duplicated(subset=subset, keep="first").to_numpy()))
 
 
 def strip_whitespace(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
     """
-    Обрезает пробелы в строковых столбцах (по умолчанию - все object/string).
+    Обрезает пробелы в строковых столбцах (по умолчанию - все object/string) ядром Arrow.
     """
     if columns is None:
         columns = [c for c in df.columns if df[c].dtype == "object" or pd.api.types.is_string_dtype(df[c])]
     for c in columns:
-        df[c] = df[c].astype("string").str.strip()
+        df[c] = df[c].astype(_STRING_DTYPE).str.strip()
     return df
 
 
 def normalize_text_series(s: pd.Series) -> pd.Series:
     """
     Приводит строки к нижнему регистру, убирает лишние пробелы.
+    Все шаги - ядра pyarrow.compute над одним Arrow-буфером. Схлопывание пробелов через
+    split/join по Unicode-пробелам: \\s в RE2 (replace_substring_regex) не видит, например, NBSP.
     """
-    s = s.astype("string")
-    s = s.str.strip()
-    s = s.str.replace(r"\s+", " ", regex=True)
-    s = s.str.lower()
-    return s
+    s = s.astype(_STRING_DTYPE)
+    arr = pc.utf8_trim_whitespace(pa.array(s.array))
+    arr = pc.binary_join(pc.utf8_split_whitespace(arr), pa.scalar(" ", arr.type))
+    arr = pc.utf8_lower(arr)
+    return pd.Series(pd.arrays.ArrowStringArray(arr), index=s.index, name=s.name)
 
 
 def normalize_categorical(df: pd.DataFrame, columns: Sequence[str], fill_unknown: bool = False) -> pd.DataFrame:
     """
     Нормализует текстовые категории: обрезает пробелы, приводит к нижнему регистру. При fill_unknown заполняет NaN как 'unknown'.
+    Результат хранится как category: сравнения и группировки идут по кодам, в Parquet - словарное кодирование.
     """
     for c in columns:
         if c in df.columns:
-            df[c] = normalize_text_series(df[c])
+            s = normalize_text_series(df[c])
             if fill_unknown:
-                df[c] = df[c].fillna("unknown")
+                s = s.fillna("unknown")
+            df[c] = s.astype("category")
     return df
 
 
@@ -88,21 +111,21 @@ def to_datetime(df: pd.DataFrame, column: str, dayfirst: bool = True, fmt: str |
     return df
 
 
-def to_int(df: pd.DataFrame, column: str) -> pd.DataFrame:
+def to_int(df: pd.DataFrame, column: str, dtype: str = "Int64") -> pd.DataFrame:
     """
-    Преобразует столбец к pandas Int64 (nullable).
+    Преобразует столбец к nullable целому (по умолчанию Int64; для ограниченных счётчиков - Int32).
     """
     if column in df.columns:
-        df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+        df[column] = pd.to_numeric(df[column], errors="coerce").astype(dtype)
     return df
 
 
-def to_float(df: pd.DataFrame, column: str) -> pd.DataFrame:
+def to_float(df: pd.DataFrame, column: str, precision: str = "float64") -> pd.DataFrame:
     """
-    Преобразует столбец к float64 (nullable).
+    Преобразует столбец к float (NaN для некорректных значений); precision="float32" - для малых величин.
     """
     if column in df.columns:
-        df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+        df[column] = pd.to_numeric(df[column], errors="coerce").astype(precision)
     return df
 
 
@@ -111,7 +134,7 @@ def id_to_string(df: pd.DataFrame, column: str) -> pd.DataFrame:
     Оставляет идентификатор строковым без промежуточного to_numeric (не теряем нули/буквы).
     """
     if column in df.columns:
-        df[column] = df[column].astype("string").str.strip()
+        df[column] = df[column].astype(_STRING_DTYPE).str.strip()
     return df
 
 
@@ -120,14 +143,14 @@ def df_brief(df: pd.DataFrame) -> dict[str, Any]:
     Короткое описание датафрейма: размер, типы, пропуски, первые 5 строк.
     """
     dtypes_map = {str(c): str(t) for c, t in df.dtypes.items()}
-    nan_counts = df.isna().sum()
+    nan_counts = df.isna().sum().to_numpy()
     info = {
         "rows": int(df.shape[0]),
         "cols": int(df.shape[1]),
         "columns": list(map(str, df.columns)),
         "dtypes": dtypes_map,
-        "nan_counts": {str(c): int(nan_counts[c]) for c in df.columns},
-        "sample": json.loads(df.head(5).to_json(orient="records", date_format="iso", force_ascii=False)),
+        "nan_counts": dict(zip(map(str, df.columns), map(int, nan_counts))),
+        "sample": srs_io.sample_records(df.head(5)),
     }
     return info
 
@@ -166,10 +189,10 @@ def clean_calls(df: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
     df = drop_duplicate_rows(df, subset=["Id"])
     df = id_to_string(df, "Id")
     df = to_datetime(df, "Call Start Time", dayfirst=True)
-    df = to_int(df, "Call Duration (in seconds)")
+    df = to_int(df, "Call Duration (in seconds)", dtype="Int32")
 
     if "CONTACTID" in df.columns:
-        df["CONTACTID"] = df["CONTACTID"].astype("string").str.strip()
+        df["CONTACTID"] = df["CONTACTID"].astype(_STRING_DTYPE).str.strip()
 
     if "Scheduled in CRM" in df.columns:
         df["Scheduled in CRM"] = pd.to_numeric(df["Scheduled in CRM"], errors="coerce").fillna(0).astype(int).astype(bool)
@@ -196,8 +219,8 @@ def clean_spend(df: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
     df = to_datetime(df, "Date", dayfirst=True, fmt="%Y-%m-%d %H:%M:%S")
     if "Date" in df.columns:
         df["Date"] = df["Date"].dt.normalize()
-    df = to_int(df, "Impressions")
-    df = to_int(df, "Clicks")
+    df = to_int(df, "Impressions", dtype="Int32")
+    df = to_int(df, "Clicks", dtype="Int32")
     df = to_float(df, "Spend")
 
     removed_cols = sorted(set(before_cols) - set(df.columns))
@@ -216,27 +239,29 @@ def clean_deals(df: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
     df = drop_all_null_columns(df)
     df = strip_whitespace(df)
     df = drop_duplicate_rows(df, subset=["Id"])
-    df = df.dropna(subset=["Id"])
     df = id_to_string(df, "Id")
-    df = df[df["Id"].notna()]
-    df = df[~df["Id"].isin(["", "nan", "NaN", "<NA>"])]
+    # Пропуски и строковые заглушки Id - одной маской (isin по Arrow-строкам идет через pyarrow is_in).
+    bad_id = df["Id"].isna() | df["Id"].isin(["", "nan", "NaN", "<NA>"])
+    df = df[~bad_id.to_numpy()]
 
     df = to_datetime(df, "Created Time", dayfirst=True)
     df = df.dropna(subset=["Created Time"])
     df = to_datetime(df, "Closing Date", dayfirst=True)
 
+    # Суммы оставляем во float64 (их суммируют в выручку), длительности в месяцах - небольшие числа.
     df = to_float(df, "Initial Amount Paid")
     df = to_float(df, "Offer Total Amount")
-    df = to_float(df, "Course duration")
-    df = to_float(df, "Months of study")
+    df = to_float(df, "Course duration", precision="float32")
+    df = to_float(df, "Months of study", precision="float32")
     if "SLA" in df.columns:
         # SLA arrives as hh:mm:ss strings -> convert to float hours for analytics.
         sla_series = df["SLA"]
         if pd.api.types.is_numeric_dtype(sla_series):
             df["SLA"] = pd.to_numeric(sla_series, errors="coerce").astype("float64")
         else:
-            sla_td = pd.to_timedelta(sla_series, errors="coerce")
-            df["SLA"] = sla_td.dt.total_seconds() / 3600
+            # Часы напрямую из int64-наносекунд (NaT - минимальный int64) одним делением.
+            sla_ns = pd.to_timedelta(sla_series, errors="coerce").to_numpy(dtype="timedelta64[ns]").view("int64")
+            df["SLA"] = np.where(sla_ns == np.iinfo(np.int64).min, np.nan, sla_ns / 3.6e12)
         notes.append("SLA переводим в часы (float).")
 
 
@@ -254,13 +279,94 @@ def clean_deals(df: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
 
 # Запуск и отчёт 
 
+def _to_rel(p: Path) -> str:
+    """
+    Путь относительно корня проекта (для отчёта), иначе - как есть.
+    """
+    try:
+        return p.relative_to(srs_io.BASE_DIR).as_posix()
+    except Exception:
+        return p.as_posix()
+
+
+def _clean_one(t: dict[str, Any], clean_dir: Path) -> tuple[list[str], dict[str, Any]]:
+    """
+    Обрабатывает одну таблицу: чтение, очистка, запись CSV/Parquet.
+    Возвращает строки MD-отчёта и запись JSON-отчёта (выполняется в отдельном процессе).
+    """
+    name: str = t["name"]
+    fpath: Path = t["path"]
+    out_base: str = t["clean_name"]
+    clean_fn = t["clean_fn"]
+
+    lines: list[str] = [f"\n## {name}\n"]
+    try:
+        df_raw = pd.read_excel(fpath, dtype=str, engine=_EXCEL_ENGINE)
+        before = df_brief(df_raw)
+
+        # "before" уже снят, исходник дальше не нужен - отдаем его в clean_* без копии.
+        df_clean, notes = clean_fn(df_raw)
+        del df_raw
+        after = df_brief(df_clean)
+
+        rows_removed = max(0, before["rows"] - after["rows"])
+        cols_removed = [c for c in before["columns"] if c not in after["columns"]]
+
+        csv_path = Path(clean_dir) / f"{out_base}.csv"
+        parquet_path = Path(clean_dir) / f"{out_base}.parquet"
+        # CSV и Parquet пишутся параллельно; Parquet - в ZSTD с сортировкой по ключам,
+        # чтобы работала фильтрация по row group.
+        srs_io.write_csv_and_parquet(df_clean, csv_path, parquet_path, sort_by=t["sort_by"])
+
+        lines.append(f"Итог: {before['rows']}x{before['cols']} → {after['rows']}x{after['cols']}\n")
+        if rows_removed:
+            lines.append(f"- Удалены строки: {rows_removed}\n")
+        if cols_removed:
+            lines.append(f"- Удалены столбцы: {cols_removed}\n")
+        if notes:
+            for note in notes:
+                lines.append(f"- {note}\n")
+
+        entry = {
+            "name": name,
+            "path": _to_rel(fpath),
+            "status": "ok",
+            "before": before,
+            "after": after,
+            "changes": {
+                "rows_removed": rows_removed,
+                "columns_removed": cols_removed,
+                "notes": notes,
+            },
+            "clean_output": _to_rel(csv_path),
+            "clean_output_parquet": _to_rel(parquet_path),
+        }
+    except Exception as e:  # noqa: BLE001
+        lines.append("- Ошибка: не удалось очистить файл\n")
+        lines.append(f"- Путь: `{fpath.as_posix()}`\n")
+        lines.append(f"- Сообщение: {e}\n")
+        entry = {
+            "name": name,
+            "path": _to_rel(fpath),
+            "status": "error",
+            "error": str(e),
+        }
+
+    lines.append("\n---\n")
+    return lines, entry
+
+
 def run_cleaning(
     raw_dir: Path | str | None = None,
     clean_dir: Path | str | None = None,
     report_path: Path | str | None = None,
+    max_workers: Optional[int] = 1,
 ) -> dict[str, Any]:
     """
     Запускает полный цикл очистки: читает исходные файлы, очищает, сохраняет CSV/Parquet и отчёт.
+    По умолчанию таблицы обрабатываются последовательно в текущем процессе: из Dash-колбэка пул процессов
+    на Windows/macOS (spawn) переимпортировал бы приложение в каждом воркере. Пул процессов
+    (max_workers > 1, None - min(4, число таблиц)) используется при запуске из командной строки.
     """
 
     raw_dir = Path(raw_dir) if raw_dir else srs_io.RAW_DIR
@@ -272,10 +378,14 @@ def run_cleaning(
     report_md_path.parent.mkdir(parents=True, exist_ok=True)
 
     tasks: list[dict[str, Any]] = [
-        {"name": "Contacts", "path": raw_dir / "Contacts (Done).xlsx", "clean_name": "Contacts", "clean_fn": clean_contacts},
-        {"name": "Calls", "path": raw_dir / "Calls_(Done).xlsx", "clean_name": "Calls", "clean_fn": clean_calls},
-        {"name": "Spend", "path": raw_dir / "Spend (Done).xlsx", "clean_name": "Spend", "clean_fn": clean_spend},
-        {"name": "Deals", "path": raw_dir / "Deals (Done).xlsx", "clean_name": "Deals", "clean_fn": clean_deals},
+        {"name": "Contacts", "path": raw_dir / "Contacts (Done).xlsx", "clean_name": "Contacts", "clean_fn": clean_contacts,
+         "sort_by": ["Id"]},
+        {"name": "Calls", "path": raw_dir / "Calls_(Done).xlsx", "clean_name": "Calls", "clean_fn": clean_calls,
+         "sort_by": ["CONTACTID", "Call Start Time"]},
+        {"name": "Spend", "path": raw_dir / "Spend (Done).xlsx", "clean_name": "Spend", "clean_fn": clean_spend,
+         "sort_by": ["Date"]},
+        {"name": "Deals", "path": raw_dir / "Deals (Done).xlsx", "clean_name": "Deals", "clean_fn": clean_deals,
+         "sort_by": ["Contact Name", "Created Time"]},
     ]
 
     lines: list[str] = []
@@ -284,76 +394,20 @@ def run_cleaning(
     lines.append("# Шаг 2 - EDA / Очистка (data/clean)\n")
     lines.append("Очистка выгрузок CRM и сохранение очищенных данных в `data/clean`.\n")
 
-    def _to_rel(p: Path) -> str:
-        try:
-            return p.relative_to(srs_io.BASE_DIR).as_posix()
-        except Exception:
-            return p.as_posix()
-
-    for t in tasks:
-        name: str = t["name"]
-        fpath: Path = t["path"]
-        out_base: str = t["clean_name"]
-        clean_fn = t["clean_fn"]
-
-        lines.append(f"\n## {name}\n")
-        try:
-            df_raw = pd.read_excel(fpath, dtype=str)
-            before = df_brief(df_raw)
-
-            df_clean, notes = clean_fn(df_raw.copy())
-            after = df_brief(df_clean)
-
-            rows_removed = max(0, before["rows"] - after["rows"])
-            cols_removed = [c for c in before["columns"] if c not in after["columns"]]
-
-            csv_path = Path(clean_dir) / f"{out_base}.csv"
-            parquet_path = Path(clean_dir) / f"{out_base}.parquet"
-            srs_io.write_table(df_clean, csv_path)
-            srs_io.write_table(df_clean, parquet_path)
-
-            lines.append(f"Итог: {before['rows']}x{before['cols']} → {after['rows']}x{after['cols']}\n")
-            if rows_removed:
-                lines.append(f"- Удалены строки: {rows_removed}\n")
-            if cols_removed:
-                lines.append(f"- Удалены столбцы: {cols_removed}\n")
-            if notes:
-                for note in notes:
-                    lines.append(f"- {note}\n")
-
-            report_list.append(
-                {
-                    "name": name,
-                    "path": _to_rel(fpath),
-                    "status": "ok",
-                    "before": before,
-                    "after": after,
-                    "changes": {
-                        "rows_removed": rows_removed,
-                        "columns_removed": cols_removed,
-                        "notes": notes,
-                    },
-                    "clean_output": _to_rel(csv_path),
-                    "clean_output_parquet": _to_rel(parquet_path),
-                }
-            )
-        except Exception as e:  # noqa: BLE001
-            lines.append("- Ошибка: не удалось очистить файл\n")
-            lines.append(f"- Путь: `{fpath.as_posix()}`\n")
-            lines.append(f"- Сообщение: {e}\n")
-            report_list.append(
-                {
-                    "name": name,
-                    "path": _to_rel(fpath),
-                    "status": "error",
-                    "error": str(e),
-                }
-            )
-
-        lines.append("\n---\n")
+    workers = max_workers or min(4, len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_clean_one, tasks, [clean_dir] * len(tasks)))
+    else:
+        results = [_clean_one(t, clean_dir) for t in tasks]
+
+    # Отчёт собираем в исходном порядке задач.
+    for task_lines, entry in results:
+        lines.extend(task_lines)
+        report_list.append(entry)
 
     report_md_path.write_text("\n".join(lines), encoding="utf-8")
-    report_json_path.write_text(json.dumps(report_list, ensure_ascii=False, indent=2), encoding="utf-8")
+    report_json_path.write_bytes(srs_io.dumps_json(report_list))
 
     safe_print(f"MD report saved to {report_md_path}")
     safe_print(f"JSON report saved to {report_json_path}")
@@ -361,4 +415,4 @@ def run_cleaning(
 
 
 if __name__ == "__main__":
-    run_cleaning()
+    run_cleaning(max_workers=None)
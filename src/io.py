@@ -8,11 +8,24 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import json
+import os
 import sys
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
 # === Базовые пути ===
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = BASE_DIR / "data"
@@ -22,86 +35,458 @@ RAW_DIR = DATA_DIR / "raw"
 TEMP_DIR = DATA_DIR / "temp"
 CLEAN_DIR = DATA_DIR / "clean"
 
+# Строковые префиксы каталогов: пути к файлам собираются конкатенацией без разбора частей Path
+_CLEAN_PREFIX = str(CLEAN_DIR) + os.sep
+_TEMP_PREFIX = str(TEMP_DIR) + os.sep
+_REPORTS_PREFIX = str(REPORTS_DIR) + os.sep
+
+# Каталоги, уже созданные в этом процессе: mkdir для них больше не вызываем
+_ensured_dirs: set[str] = set()
+
+
+def _ensure_dir(path: Path) -> None:
+    """
+    Создаёт каталог один раз за процесс.
+    """
+    key = str(path)
+    if key not in _ensured_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(key)
+
 
-def safe_print(msg: str) -> None:
+def _write_in_dir(path: Path, write: Callable[[], None]) -> None:
     """
-    Печать с заменой некодируемых символов, чтобы не падать на Windows-консолях.
+    Запись файла в каталог из кэша _ensured_dirs. Если каталог удалили, пока процесс работал
+    (FileNotFoundError), он убирается из кэша, создаётся заново и запись повторяется один раз.
     """
+    _ensure_dir(path.parent)
+    try:
+        write()
+    except FileNotFoundError:
+        _ensured_dirs.discard(str(path.parent))
+        _ensure_dir(path.parent)
+        write()
+
+
+# Рабочие каталоги создаём один раз при импорте
+for _dir in (TEMP_DIR, CLEAN_DIR, REPORTS_DIR):
     try:
-        print(msg)
-    except UnicodeEncodeError:
-        enc = sys.stdout.encoding or "utf-8"
-        print(msg.encode(enc, errors="replace").decode(enc, errors="replace"))
+        _ensure_dir(_dir)
+    except OSError:
+        pass
+
+# Единые параметры записи Parquet (write_table и write_parquet_optimized): словари, страницы по 1 МБ,
+# row group по 64 тыс. строк со статистиками для фильтров при чтении. Сжатие (zstd или нет) - см. _parquet_compression.
+PARQUET_OPTIMIZED = {
+    "use_dictionary": True,
+    "data_page_size": 1 << 20,
+    "row_group_size": 64_000,
+    "write_statistics": True,
+}
+
+# Сжатие оставляем, только если оно экономит хотя бы 10% объёма (иначе только тратит CPU на чтении).
+_MIN_COMPRESSION_GAIN = 0.10
+_COMPRESSION_PROBE_ROWS = 64_000
+
+# CSV пишется блоками строк: не больше 65536 строк и ~1 млн ячеек на блок, чтобы широкие таблицы не раздували память
+_CSV_CHUNK_ROWS = 65_536
+_CSV_CHUNK_CELLS = 1_000_000
+
+
+def dumps_json(obj) -> bytes:
+    """
+    JSON с отступом 2 и без экранирования не-ASCII, в UTF-8 байтах.
+    С orjson сериализация идёт в C-расширении (numpy-значения и не-строковые ключи тоже), иначе - stdlib json
+    после _json_plain: NaN/inf в обоих случаях пишутся как null, numpy-значения - как числа и списки.
+    Значения одинаковы, но запись float с экспонентой зависит от сериализатора: orjson пишет 5.805028e18,
+    1.5e-7 и 0.00001, stdlib - 5.805028e+18, 1.5e-07 и 1e-05. Побайтно отчёты совпадают, только если в них нет таких чисел.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_json_plain(obj), ensure_ascii=False, indent=2, allow_nan=False).encode("utf-8")
+
+
+def _json_plain(obj):
+    """
+    Приводит объект к тому, что stdlib json запишет так же, как orjson с OPT_SERIALIZE_NUMPY:
+    numpy-скаляры и массивы - в значения Python (float32 - кратчайшей записью), NaN/inf - в None.
+    """
+    if isinstance(obj, dict):
+        return {k: _json_plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_plain(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _json_plain(obj.tolist())
+    if isinstance(obj, (np.float16, np.float32)):
+        obj = float(str(obj))
+    elif isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return None
+    return obj
+
+
+def _json_float(x: float) -> float:
+    """
+    Округление float как в to_json (double_precision=10): 10 знаков после точки,
+    а для |x| > 1e16 и 0 < |x| < 1e-15 - 10 значащих цифр в экспоненциальной записи.
+    """
+    ax = abs(x)
+    if ax > 1e16 or 0 < ax < 1e-15:
+        return float(f"{x:.10g}")
+    return float(f"{x:.10f}")
+
+
+def _json_timestamp(ts: pd.Timestamp) -> Optional[str]:
+    """
+    Дата/время как в to_json(date_format="iso"): миллисекунды, время с зоной - в UTC с суффиксом Z.
+    """
+    if ts is pd.NaT:
+        return None
+    if ts.tzinfo is not None:
+        return ts.tz_convert("UTC").strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    return ts.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
+
+
+def _json_value(v: Any) -> Any:
+    """
+    Значение object-столбца так, как его пишет to_json(date_format="iso"): время суток - isoformat(),
+    date/datetime/Timestamp - см. _json_timestamp, интервалы - ISO 8601, numpy-скаляры - Python-числа.
+    """
+    if isinstance(v, (float, np.floating)):
+        return _json_float(float(v))
+    if isinstance(v, (bool, np.bool_)):
+        return bool(v)
+    if isinstance(v, np.integer):
+        return int(v)
+    if isinstance(v, time):
+        return v.isoformat()
+    # datetime и Timestamp - подклассы date
+    if isinstance(v, (date, np.datetime64)):
+        return _json_timestamp(pd.Timestamp(v))
+    if isinstance(v, (timedelta, np.timedelta64)):
+        return pd.Timedelta(v).isoformat()
+    return v
+
+
+def sample_records(sample: pd.DataFrame) -> list[dict[str, Any]]:
+    """
+    Строки выборки как список dict без сериализации в JSON и обратно; значения приводятся
+    так же, как в to_json(date_format="iso"): даты - ISO с миллисекундами, float - см. _json_float,
+    значения object-столбцов - см. _json_value, пропуски - None. Результат сериализуется и stdlib json.
+    """
+    out = sample.astype(object)
+    for c in sample.columns:
+        col = sample[c]
+        if pd.api.types.is_datetime64_any_dtype(col):
+            if col.dt.tz is not None:
+                out[c] = (col.dt.tz_convert("UTC").dt.strftime("%Y-%m-%dT%H:%M:%S.%f").str[:-3] + "Z").astype(object)
+            else:
+                out[c] = col.dt.strftime("%Y-%m-%dT%H:%M:%S.%f").str[:-3].astype(object)
+        elif pd.api.types.is_float_dtype(col):
+            out[c] = col.map(_json_float).astype(object)
+        elif col.dtype == object or pd.api.types.is_timedelta64_dtype(col):
+            out[c] = col.map(_json_value).astype(object)
+    out = out.where(sample.notna(), None)
+    # Ключи тоже как у to_json: подписи-даты в ISO, остальные через str
+    out.columns = [
+        _json_timestamp(pd.Timestamp(c)) if isinstance(c, (date, np.datetime64)) else str(c)
+        for c in sample.columns
+    ]
+    return out.to_dict(orient="records")
+
+
+# Кодировка консоли определяется один раз; в UTF-8 любой символ печатается и safe_print - обычный print
+_STDOUT_ENC = (getattr(sys.stdout, "encoding", None) or "utf-8").lower()
+
+if _STDOUT_ENC in ("utf-8", "utf8"):
+    safe_print = print
+else:
+    def safe_print(msg: str) -> None:
+        """
+        Печать с заменой некодируемых символов, чтобы не падать на Windows-консолях.
+        """
+        try:
+            print(msg)
+        except UnicodeEncodeError:
+            print(msg.encode(_STDOUT_ENC, errors="replace").decode(_STDOUT_ENC, errors="replace"))
+
+
+def _parquet_compression(table: pa.Table) -> Optional[str]:
+    """
+    Выбор сжатия по пробной записи первого row group в память: zstd или без сжатия.
+    """
+    probe = table.slice(0, _COMPRESSION_PROBE_ROWS)
+    sizes = {}
+    for codec in ("zstd", "none"):
+        sink = pa.BufferOutputStream()
+        pq.write_table(probe, sink, compression=codec, use_dictionary=True)
+        sizes[codec] = sink.getvalue().size
+    if sizes["zstd"] <= sizes["none"] * (1 - _MIN_COMPRESSION_GAIN):
+        return "zstd"
+    return None
+
+
+def _read_parquet(path: Path, **kwargs) -> pd.DataFrame:
+    """
+    Parquet через pyarrow с проталкиванием columns/filters.
+    """
+    columns = kwargs.pop("columns", None)
+    filters = kwargs.pop("filters", None)
+    return pq.read_table(path, columns=columns, filters=filters, **kwargs).to_pandas()
+
+
+def _write_csv(df: pd.DataFrame, path: Path, index: bool, **kwargs) -> None:
+    """
+    CSV блоками строк (см. _CSV_CHUNK_ROWS/_CSV_CHUNK_CELLS).
+    """
+    kwargs.setdefault("chunksize", max(1, min(_CSV_CHUNK_ROWS, _CSV_CHUNK_CELLS // max(1, df.shape[1]))))
+    df.to_csv(path, index=index, **kwargs)
+
+
+def _write_parquet(df: pd.DataFrame, path: Path, index: bool, **kwargs) -> None:
+    """
+    Parquet через pyarrow по PARQUET_OPTIMIZED, zstd - если даёт выигрыш.
+    kwargs уходят в pyarrow.parquet.write_table (не в DataFrame.to_parquet); engine допускается только pyarrow.
+    Если compression задан вызывающим, пробная запись не выполняется и compression_level не подставляется.
+    """
+    engine = kwargs.pop("engine", "pyarrow")
+    if engine not in ("pyarrow", "auto"):
+        raise ValueError(f"Parquet пишется только через pyarrow, engine={engine!r} не поддерживается")
+    table = pa.Table.from_pandas(df, preserve_index=index)
+    options = dict(PARQUET_OPTIMIZED)
+    if "compression" not in kwargs:
+        options["compression"] = _parquet_compression(table)
+        if options["compression"] == "zstd":
+            options["compression_level"] = 3
+    options.update(kwargs)
+    pq.write_table(table, path, **options)
+
+
+# Чтение/запись по расширению файла: новый формат - одна строка в словаре
+_READERS: Dict[str, Callable[..., pd.DataFrame]] = {
+    ".csv": pd.read_csv,
+    ".xlsx": pd.read_excel,
+    ".xls": pd.read_excel,
+    ".parquet": _read_parquet,
+}
+_WRITERS: Dict[str, Callable[..., None]] = {
+    ".csv": _write_csv,
+    ".parquet": _write_parquet,
+}
 
 
 def read_table(path: Path, **kwargs) -> pd.DataFrame:
     """
     Универсальное чтение таблицы (.csv, .xlsx, .parquet).
+    CSV по умолчанию читается C-движком pandas. Для больших файлов можно передать engine="pyarrow"
+    (многопоточный разбор), но типы тогда другие: столбцы с датой и временем приходят как datetime64[s],
+    только с датой - как объекты datetime.date, а не строки; chunksize/converters и т.п. он не поддерживает.
+    Для Parquet columns/filters передаются в pyarrow и читаются только нужные столбцы и row group.
     """
-    path = Path(path)
-    if not path.exists():
-        raise FileNotFoundError(f"Файл не найден: {path}")
-
+    if not isinstance(path, Path):
+        path = Path(path)
     suffix = path.suffix.lower()
-    if suffix == ".csv":
-        return pd.read_csv(path, **kwargs)
-    if suffix in [".xlsx", ".xls"]:
-        return pd.read_excel(path, **kwargs)
-    if suffix == ".parquet":
-        return pd.read_parquet(path, **kwargs)
-    raise ValueError(f"Неподдерживаемое расширение файла: {suffix}")
+    reader = _READERS.get(suffix)
+    if reader is None:
+        raise ValueError(f"Неподдерживаемое расширение файла: {suffix}")
+    # Отдельный exists() не нужен: ридер сам открывает файл, сообщение подменяем только при ошибке
+    try:
+        return reader(path, **kwargs)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Файл не найден: {path}") from e
 
 
-def write_table(df: pd.DataFrame, path: Path, index: bool = False, **kwargs) -> None:
+def write_table(df: pd.DataFrame, path: Path, index: bool = False, verbose: bool = True, **kwargs) -> None:
     """
     Запись датафрейма в .csv или .parquet.
+    Parquet пишется через pyarrow по PARQUET_OPTIMIZED, zstd - если даёт выигрыш;
+    kwargs для Parquet - параметры pyarrow.parquet.write_table (compression, row_group_size и т.п.).
+    verbose=False - без сообщения в консоль (печатает вызывающий).
     """
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-
+    if not isinstance(path, Path):
+        path = Path(path)
     suffix = path.suffix.lower()
-    if suffix == ".csv":
-        df.to_csv(path, index=index, **kwargs)
-    elif suffix == ".parquet":
-        df.to_parquet(path, index=index, **kwargs)
-    else:
+    writer = _WRITERS.get(suffix)
+    if writer is None:
         raise ValueError(f"Неподдерживаемое расширение: {suffix}")
 
-    safe_print(f"OK. Saved: {path}")
+    _write_in_dir(path, lambda: writer(df, path, index, **kwargs))
+
+    if verbose:
+        safe_print(f"OK. Saved: {path}")
+
+
+def write_parquet_optimized(
+    df: pd.DataFrame,
+    path: Path,
+    sort_by: Optional[Sequence[str]] = None,
+    verbose: bool = True,
+) -> None:
+    """
+    Запись Parquet (как write_table) с сортировкой по ключевым столбцам: соседние строки попадают
+    в одни row group, и их min/max-статистики отсекают лишние группы при фильтрации.
+    """
+    keys = [c for c in (sort_by or []) if c in df.columns]
+    if keys:
+        df = df.sort_values(keys, kind="stable", na_position="last", ignore_index=True)
+    write_table(df, path, verbose=verbose)
+
+
+def write_csv_and_parquet(
+    df: pd.DataFrame,
+    csv_path: Path,
+    parquet_path: Path,
+    sort_by: Optional[Sequence[str]] = None,
+) -> None:
+    """
+    Пишет одну таблицу в CSV и оптимизированный Parquet параллельно: кодирование Parquet в pyarrow
+    отпускает GIL, поэтому общее время ближе к max(csv, parquet), а не к сумме.
+    Потоки пишут молча, сообщения печатаются после записи по порядку (иначе строки в консоли рвутся).
+    """
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [
+            pool.submit(write_table, df, csv_path, verbose=False),
+            pool.submit(write_parquet_optimized, df, parquet_path, sort_by, verbose=False),
+        ]
+        for future in futures:
+            future.result()
+    safe_print(f"OK. Saved: {csv_path}")
+    safe_print(f"OK. Saved: {parquet_path}")
 
 
 def load_clean(name: str, fmt: str = "csv", **kwargs) -> pd.DataFrame:
     """
     Читает очищенную таблицу из data/clean/.
     """
-    path = CLEAN_DIR / f"{name}.{fmt}"
-    return read_table(path, **kwargs)
+    return read_table(Path(_CLEAN_PREFIX + name + "." + fmt), **kwargs)
+
+
+_FILTER_OPS: Dict[str, Callable[[pd.Series, Any], pd.Series]] = {
+    "=": lambda s, v: s == v,
+    "==": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+    "<": lambda s, v: s < v,
+    "<=": lambda s, v: s <= v,
+    ">": lambda s, v: s > v,
+    ">=": lambda s, v: s >= v,
+    "in": lambda s, v: s.isin(v),
+    "not in": lambda s, v: ~s.isin(v),
+}
+
+
+def _filters_mask(df: pd.DataFrame, filters: Sequence[Tuple[str, str, object]]) -> pd.Series:
+    """
+    Маска строк для фильтров в формате pyarrow (col, op, value), объединённых через И.
+    Как и в pyarrow, сравнение с пропуском отбрасывает строку, а in/not in считают пропуск
+    не входящим в список.
+    """
+    mask = pd.Series(True, index=df.index)
+    for col, op, value in filters:
+        try:
+            compare = _FILTER_OPS[op]
+        except KeyError:
+            raise ValueError(f"Неподдерживаемый оператор фильтра: {op!r}") from None
+        matched = compare(df[col], value)
+        if op not in ("in", "not in"):
+            matched &= df[col].notna()
+        mask &= matched
+    return mask
+
+
+def _filters_key(filters: Sequence[Tuple[str, str, object]]) -> Tuple[Tuple[str, str, object], ...]:
+    """
+    Фильтры как хешируемый ключ кэша: списки/множества значений для in/not in становятся кортежами.
+    """
+    return tuple(
+        (col, op, tuple(value) if isinstance(value, (list, set, frozenset)) else value)
+        for col, op, value in filters
+    )
+
+
+@lru_cache(maxsize=32)
+def load_clean_table(
+    name: str,
+    columns: Optional[Tuple[str, ...]] = None,
+    mtime: float = 0.0,
+    filters: Optional[Tuple[Tuple[str, str, object], ...]] = None,
+) -> pd.DataFrame:
+    """
+    Кэшируемое чтение набора из data/clean: приоритет Parquet, затем CSV.
+    mtime входит в ключ кэша, чтобы изменённый файл перечитывался; filters проталкиваются в Parquet,
+    а для CSV применяются к прочитанной таблице.
+    """
+    parquet_path = Path(_CLEAN_PREFIX + name + ".parquet")
+    if parquet_path.exists():
+        try:
+            return pd.read_parquet(
+                parquet_path,
+                columns=list(columns) if columns else None,
+                filters=list(filters) if filters else None,
+            )
+        except Exception:
+            pass
+    csv_path = Path(_CLEAN_PREFIX + name + ".csv")
+    if csv_path.exists():
+        if not filters:
+            return pd.read_csv(csv_path, usecols=list(columns) if columns else None)
+        usecols = None
+        if columns:
+            usecols = list(dict.fromkeys(list(columns) + [col for col, _, _ in filters]))
+        df = pd.read_csv(csv_path, usecols=usecols)
+        df = df.loc[_filters_mask(df, filters)].reset_index(drop=True)
+        return df[list(columns)] if columns else df
+    raise FileNotFoundError(f"Не найден файл для набора {name} в {CLEAN_DIR}")
+
+
+def read_clean(
+    name: str,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Sequence[Tuple[str, str, object]]] = None,
+) -> pd.DataFrame:
+    """
+    Читает набор из data/clean через общий кэш (один раз на процесс, пока файл не изменился).
+    Возвращает неглубокую копию: новые/заменённые столбцы у вызывающего не попадают в кэш.
+    """
+    path = Path(_CLEAN_PREFIX + name + ".parquet")
+    if not path.exists():
+        path = Path(_CLEAN_PREFIX + name + ".csv")
+    mtime = path.stat().st_mtime if path.exists() else 0.0
+    df = load_clean_table(
+        name,
+        tuple(columns) if columns else None,
+        mtime,
+        _filters_key(filters) if filters else None,
+    )
+    return df.copy(deep=False)
 
 
 def save_temp(df: pd.DataFrame, name: str, fmt: str = "csv") -> None:
     """
     Сохраняет промежуточный файл в data/temp/.
     """
-    path = TEMP_DIR / f"{name}.{fmt}"
-    write_table(df, path)
+    write_table(df, Path(_TEMP_PREFIX + name + "." + fmt))
 
 
 def save_report(obj, name: str, fmt: str = "json") -> None:
     """
     Сохраняет отчёт (json или md) в reports/.
     """
-    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
-    path = REPORTS_DIR / f"{name}.{fmt}"
+    path = _REPORTS_PREFIX + name + "." + fmt
 
     if fmt == "json":
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(obj, f, ensure_ascii=False, indent=2)
+        data, mode, encoding = dumps_json(obj), "wb", None
     elif fmt == "md":
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(str(obj))
+        data, mode, encoding = str(obj), "w", "utf-8"
     else:
         raise ValueError("Допустимые форматы: json или md")
 
+    def write() -> None:
+        with open(path, mode, encoding=encoding) as f:
+            f.write(data)
+
+    _write_in_dir(Path(path), write)
+
     safe_print(f"OK - report saved: {path}")
 
 
@@ -3,123 +3,459 @@
 """
 Импорт исходных данных и генерация отчёта.
 
-Поиск всех файлы Excel (*.xlsx) в data/raw,
+Поиск всех файлы Excel (*.xlsx) и Parquet в data/raw,
 загрузка их с pandas и отчёт в reports/.
 
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
 from pathlib import Path
-import json
+from typing import Any, Iterable, Iterator, Optional
+import mmap
+import os
+import re
 import pandas as pd
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+
+from .io import dumps_json, sample_records
+
+try:
+    from python_calamine import CalamineWorkbook  # type: ignore
+except ImportError:  # pragma: no cover - python-calamine необязателен, тогда читаем через openpyxl
+    CalamineWorkbook = None
+
+# Строки, которые pandas по умолчанию читает как NaN (na_values у read_excel/read_csv)
+_NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+_PREVIEW_ROWS = 5
+# Числа, записанные текстом: pandas приводит такие столбцы к числовому типу целиком
+_INT_RE = re.compile(r"^\s*[-+]?\d+\s*$")
+_FLOAT_RE = re.compile(r"^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$")
+
+
+def _cell_value(value: Any) -> Any:
+    """
+    Значение ячейки как у pandas при чтении через openpyxl: NA-строки -> None, целые float -> int,
+    дата без времени (calamine) -> datetime.
+    """
+    if isinstance(value, str):
+        return None if value in _NA_STRINGS else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if type(value) is date:
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def _header_value(value: Any) -> Any:
+    """
+    Ячейка заголовка как у pandas: числа и даты - как в _cell_value, пустая строка (calamine) -> None,
+    NA-строки остаются именами столбцов.
+    """
+    if isinstance(value, str):
+        return value or None
+    return _cell_value(value)
+
+
+def _value_kind(value: Any) -> str:
+    """
+    Вид непустого значения для вывода dtype: bool/int/float/datetime/str/other
+    (строка с целым или дробным числом считается int/float).
+    """
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, datetime):
+        return "datetime"
+    if isinstance(value, str):
+        if _INT_RE.match(value):
+            return "int"
+        if _FLOAT_RE.match(value):
+            return "float"
+        return "str"
+    return "other"
+
+
+def _infer_dtype(kinds: set, has_null: bool) -> str:
+    """
+    dtype столбца по набору встреченных видов значений (по правилам вывода типов pandas).
+    """
+    if not kinds:
+        return "float64"
+    if kinds == {"bool"}:
+        return "float64" if has_null else "bool"
+    if kinds == {"int"}:
+        return "float64" if has_null else "int64"
+    if kinds <= {"int", "float", "bool"}:
+        return "float64"
+    if kinds == {"datetime"}:
+        return "datetime64[ns]"
+    return "object"
+
+
+class _MappedFile(mmap.mmap):
+    """
+    mmap как файловый объект для zipfile (seekable() у mmap есть только с Python 3.13).
+    """
+
+    def seekable(self) -> bool:
+        return True
+
+
+def _iter_xlsx_rows(fpath: Path) -> Iterator[list[Any] | tuple[Any, ...]]:
+    """
+    Строки первого листа: через python-calamine (Rust), если установлен, иначе openpyxl read_only.
+    Для openpyxl ZIP отдаётся через mmap: страницы файла подгружает ядро, без буферов Python.
+    """
+    if CalamineWorkbook is not None:
+        wb = CalamineWorkbook.from_path(str(fpath))
+        try:
+            sheet = wb.get_sheet_by_index(0)
+            # Строки calamine начинаются с первой, а столбцы - с первого занятого: пустые слева добавляем сами
+            first_col = sheet.start[1] if sheet.start else 0
+            pad = [None] * first_col
+            for row in sheet.iter_rows():
+                yield pad + row if first_col else row
+        finally:
+            wb.close()
+        return
+
+    with open(fpath, "rb") as fh, _MappedFile(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        wb = load_workbook(mm, read_only=True, data_only=True, keep_links=False)
+        try:
+            ws = wb.active
+            ws.reset_dimensions()
+            yield from ws.iter_rows(values_only=True)
+        finally:
+            wb.close()
+
+
+def _scan_xlsx_head(fpath: Path) -> tuple[int, list[Any], list[set], list[int], list[list[Any]]] | None:
+    """
+    Быстрый проход: размер листа из тега <dimension>, разбираются только заголовок и строки предпросмотра.
+    Пропуски считаются лишь по этим строкам (для вывода dtype). None, если тега нет.
+    """
+    with open(fpath, "rb") as fh, _MappedFile(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        wb = load_workbook(mm, read_only=True, data_only=True, keep_links=False)
+        try:
+            ws = wb.active
+            max_row, max_col = ws.max_row, ws.max_column
+            if not max_row or not max_col:
+                return None
+            rows = ws.iter_rows(max_row=min(max_row, _PREVIEW_ROWS + 1), values_only=True)
+            header = [_header_value(v) for v in next(rows, ())]
+            preview = [[_cell_value(v) for v in raw] for raw in rows]
+        finally:
+            wb.close()
+
+    header.extend([None] * (max_col - len(header)))
+    types: list[set] = [set() for _ in range(max_col)]
+    nan_counts = [0] * max_col
+    for values in preview:
+        values.extend([None] * (max_col - len(values)))
+        for i, v in enumerate(values):
+            if v is None:
+                nan_counts[i] += 1
+            else:
+                types[i].add(_value_kind(v))
+    # Пустые столбцы справа (без заголовка и значений) отбрасываем, как и полный проход
+    while header and header[-1] is None and not types[-1]:
+        header.pop()
+        types.pop()
+        nan_counts.pop()
+        for values in preview:
+            values.pop()
+    return max_row - 1, header, types, nan_counts, preview
+
+
+def _scan_xlsx(
+    fpath: Path,
+    deep: bool = True,
+) -> tuple[int, list[Any], list[str], list[int] | None, pd.DataFrame]:
+    """
+    Потоковый проход по первому листу: число строк, столбцы, dtypes и пропуски
+    считаются за один проход, в памяти держатся только первые строки для предпросмотра.
+    Возвращает (n_rows, columns, dtypes, nan_counts, preview_df); dtypes и nan_counts - по позиции столбца.
+
+    deep=False: число строк/столбцов берётся из тега <dimension> (может учитывать пустые
+    отформатированные строки), dtypes - по строкам предпросмотра, nan_counts = None.
+    Если тега нет, выполняется полный проход.
+    """
+    head = None if deep else _scan_xlsx_head(fpath)
+    if head is not None:
+        n_rows, header, types, preview_nans, preview = head
+        columns, dtypes, preview_df = _scan_result(header, types, preview_nans, preview)
+        return n_rows, columns, dtypes, None, preview_df
+
+    rows = _iter_xlsx_rows(fpath)
+    try:
+        header = [_header_value(v) for v in next(rows, ())]
+        while header and header[-1] is None:
+            header.pop()
+        ncols = len(header)
+        nan_counts = [0] * ncols
+        types: list[set] = [set() for _ in range(ncols)]
+        preview: list[list[Any]] = []
+        n_rows = 0
+        pending_blank = 0  # пустые строки учитываются, только если за ними есть данные (хвост pandas отрезает)
+
+        for raw in rows:
+            values = [_cell_value(v) for v in raw]
+            while values and values[-1] is None:
+                values.pop()
+            if not values:
+                pending_blank += 1
+                continue
+            if len(values) > ncols:
+                # Строка шире заголовка: новые столбцы, в предыдущих строках - пропуски.
+                extra = len(values) - ncols
+                header.extend([None] * extra)
+                nan_counts.extend([n_rows + pending_blank] * extra)
+                types.extend(set() for _ in range(extra))
+                for row in preview:
+                    row.extend([None] * extra)
+                ncols = len(values)
+            if pending_blank:
+                nan_counts = [c + pending_blank for c in nan_counts]
+                if len(preview) < _PREVIEW_ROWS:
+                    preview.extend([[None] * ncols for _ in range(min(pending_blank, _PREVIEW_ROWS - len(preview)))])
+                n_rows += pending_blank
+                pending_blank = 0
+            values.extend([None] * (ncols - len(values)))
+            for i, v in enumerate(values):
+                if v is None:
+                    nan_counts[i] += 1
+                else:
+                    types[i].add(_value_kind(v))
+            if len(preview) < _PREVIEW_ROWS:
+                preview.append(values)
+            n_rows += 1
+    finally:
+        rows.close()
+
+    columns, dtypes, preview_df = _scan_result(header, types, nan_counts, preview)
+    return n_rows, columns, dtypes, nan_counts, preview_df
+
+
+def _scan_result(
+    header: list[Any],
+    types: list[set],
+    nan_counts: list[int],
+    preview: list[list[Any]],
+) -> tuple[list[Any], list[str], pd.DataFrame]:
+    """
+    Итог прохода по листу: имена столбцов, dtypes и типизированный предпросмотр.
+    """
+    # Имена столбцов как у pandas: пустые -> "Unnamed: i", повторы -> "name.1", "name.2"...
+    columns: list[Any] = []
+    seen: dict[Any, int] = {}
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None else name
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+
+    dtypes = [_infer_dtype(t, c > 0) for t, c in zip(types, nan_counts)]
+    preview_df = pd.DataFrame(preview, columns=columns, dtype=object)
+    for col, dtype in zip(columns, dtypes):
+        if dtype == "datetime64[ns]":
+            preview_df[col] = pd.to_datetime(preview_df[col])
+        elif dtype != "object":
+            preview_df[col] = pd.to_numeric(preview_df[col]).astype(dtype)
+    return columns, dtypes, preview_df
+
+
+def _scan_parquet(fpath: Path) -> tuple[int, list[Any], list[str], list[int], pd.DataFrame]:
+    """
+    Сводка по Parquet из футера: число строк, схема и null_count из статистик row group;
+    данные читаются только для первых строк предпросмотра. Возвращает то же, что _scan_xlsx.
+    """
+    pf = pq.ParquetFile(fpath)
+    meta = pf.metadata
+    schema = pf.schema_arrow
+    columns: list[Any] = list(schema.names)
+    dtypes = [str(t) for t in schema.empty_table().to_pandas().dtypes]
+
+    # Статистики лежат по листовым столбцам: для вложенных схем индексы не совпадают с полями
+    flat = meta.num_columns == len(columns)
+    nan_counts: list[int] = []
+    for i, col in enumerate(columns):
+        stats = [meta.row_group(g).column(i).statistics for g in range(meta.num_row_groups)] if flat else [None]
+        if all(st is not None and st.has_null_count for st in stats):
+            nan_counts.append(sum(st.null_count for st in stats))
+        else:
+            # Статистик нет - считаем пропуски по самому столбцу
+            nan_counts.append(pf.read(columns=[col]).column(0).null_count)
+
+    first = next(pf.iter_batches(batch_size=_PREVIEW_ROWS), None)
+    preview_df = first.to_pandas() if first is not None else schema.empty_table().to_pandas()
+    return meta.num_rows, columns, dtypes, nan_counts, preview_df
+
+
+def _process_one(fpath: Path, deep_scan: bool = True) -> tuple[list[str], dict]:
+    """
+    Сводка по одному файлу (.xlsx или .parquet): строки markdown-отчёта и запись для JSON.
+    deep_scan=False - быстрый режим для xlsx (см. _scan_xlsx(deep=False)): пропуски не считаются.
+    """
+    lines: list[str] = [f"\n## {fpath.name}\n"]
+    # Методы списка связываем локально: без поиска атрибута на каждой строке отчёта
+    append = lines.append
+    extend = lines.extend
+    try:
+        # Потоковый проход по листу (или футер Parquet): весь файл в DataFrame не загружаем
+        if fpath.suffix == ".parquet":
+            n_rows, columns, dtypes, nan_list, df_head = _scan_parquet(fpath)
+        else:
+            n_rows, columns, dtypes, nan_list, df_head = _scan_xlsx(fpath, deep=deep_scan)
+        n_cols = len(columns)
+        # Имена столбцов приводим к str один раз, дальше идём по позиции
+        cols_str = list(map(str, columns))
+
+        # Базовая сводка по таблице
+        append("- Статус: успешно загружен\n")
+        append(f"- Путь: `{fpath.as_posix()}`\n")
+        size_note = "" if nan_list is not None else " (по тегу dimension)"
+        append(f"- Размер: {n_rows} строк × {n_cols} столбцов{size_note}\n")
+        append(f"- Столбцы: {cols_str}\n")
+
+        # Типы данных по столбцам
+        dtype_note = "" if nan_list is not None else f" - по первым {_PREVIEW_ROWS} строкам"
+        append(f"\n### Типы данных (столбец,dtype){dtype_note}\n")
+        dtype_rows = ["column,dtype"] + [f"{col},{t}" for col, t in zip(cols_str, dtypes)]
+        append("\n".join(dtype_rows))
+
+        # Пропуски (NaN) по столбцам
+        append("\n### Пропуски (NaN) по столбцам\n")
+        if nan_list is None:
+            append("Не считались (быстрый режим, deep_scan=False).")
+        else:
+            append("column,NaN")
+            extend([f"{col},{n}" for col, n in zip(cols_str, nan_list)])
+
+        # Предпросмотр первых 5 строк 
+        preview_csv = df_head.to_csv(index=False)
+        append("\n### Пример данных (первые 5 строк, CSV)\n")
+        append(preview_csv.strip())
+
+        # Данные для JSON-отчёта
+        entry = {
+            "name": fpath.name,
+            "path": fpath.as_posix(),
+            "status": "ok",
+            "rows": int(n_rows),
+            "cols": int(n_cols),
+            "columns": cols_str,
+            "dtypes": dict(zip(cols_str, dtypes)),
+            "nan_counts": dict(zip(cols_str, nan_list)) if nan_list is not None else None,
+            # Значения приводятся так же, как в to_json(date_format="iso"), без круга через JSON-строку
+            "sample": sample_records(df_head),
+        }
+    except Exception as e:
+        # Фиксируем ошибку чтения и продолжаем со следующим файлом
+        append("- Статус: ошибка при чтении файла\n")
+        append(f"- Путь: `{fpath.as_posix()}`\n")
+        append(f"- Сообщение: {e}\n")
+
+        # Для JSON фиксируем ошибку
+        entry = {
+            "name": fpath.name,
+            "path": fpath.as_posix(),
+            "status": "error",
+            "error": str(e),
+        }
+
+    # Разделитель между файлами
+    append("\n---\n")
+    return lines, entry
+
+
+def _write_reports(
+    report_path: Path,
+    header: list[str],
+    results: Iterable[tuple[list[str], dict]],
+) -> None:
+    """
+    Потоковая запись .md и .json отчётов: в памяти держится только секция текущего файла.
+    Результаты идут в исходном порядке файлов.
+    """
+    json_path = report_path.with_suffix(".json")
+    with report_path.open("w", encoding="utf-8", buffering=1 << 20) as md_fh, \
+            json_path.open("wb", buffering=1 << 20) as json_fh:
+        md_fh.write("\n".join(header))
+        json_fh.write(b"[")
+        for i, (file_lines, entry) in enumerate(results):
+            md_fh.write("\n")
+            md_fh.write("\n".join(file_lines))
+            # Тот же вид, что у JSON-списка с indent=2: элементы с отступом в 2 пробела
+            json_fh.write(b",\n  " if i else b"\n  ")
+            json_fh.write(dumps_json(entry).replace(b"\n", b"\n  "))
+        json_fh.write(b"\n]")
 
 
 def generate_import_report(
     data_dir: str | Path = "data/raw",
     report_path: str | Path = "reports/import_checklist.md",
+    deep_scan: bool = True,
+    max_workers: Optional[int] = 1,
 ) -> None:
     """
-    Загрузка всех .xlsx из каталога data/raw и запись отчёта.
+    Загрузка всех .xlsx и .parquet из каталога data/raw и запись отчёта.
 
     Параметры:
         data_dir: путь к каталогу с исходными файлами.
         report_path: путь к итоговому .md отчёту.
+        deep_scan: полный проход по листам xlsx; False - только размеры из метаданных,
+            dtypes по первым строкам, без подсчёта пропусков.
+        max_workers: 1 (по умолчанию) - файлы обрабатываются в текущем процессе (так безопасно звать
+            из Dash-колбэка); >1 или None (min(4, число файлов)) - пул процессов, для запуска из командной строки.
     """
     # Приводим пути к объектам Path и создаём каталог для отчёта при необходимости
     data_dir = Path(data_dir)
     report_path = Path(report_path)
     report_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Ищем все Excel-файлы
-    excel_files = sorted(data_dir.glob("*.xlsx"))
+    # Ищем все Excel/Parquet-файлы одним проходом scandir: тип файла берётся из DirEntry без лишних stat
+    excel_files: list[Path] = []
+    if data_dir.is_dir():
+        with os.scandir(data_dir) as it:
+            excel_files = sorted(
+                (
+                    Path(e.path)
+                    for e in it
+                    if e.is_file(follow_symlinks=False) and e.name.endswith((".xlsx", ".parquet"))
+                ),
+                key=lambda p: p.name,
+            )
 
-    # Накапливаем строки отчёта в список
+    # Заголовок отчёта
     lines: list[str] = []
     lines.append("# Отчёт о загрузке исходных данных\n")
     lines.append(f"Каталог: `{data_dir.as_posix()}`\n")
 
     if not excel_files:
         # Если файлов нет - фиксируем в отчёте
-        lines.append("Файлы *.xlsx не найдены.\n")
+        lines.append("Файлы *.xlsx / *.parquet не найдены.\n")
         report_path.write_text("\n".join(lines), encoding="utf-8")
         return
 
-    # Обрабатываем каждый Excel-файл по очереди
-    report_json: list[dict] = []
-
-    for fpath in excel_files:
-        lines.append(f"\n## {fpath.name}\n")
-        try:
-            # Загружаем файл в DataFrame
-            df_file = pd.read_excel(fpath)
-            df = df_file
-
-            # Базовая сводка по таблице
-            n_rows, n_cols = df.shape
-            lines.append("- Статус: успешно загружен\n")
-            lines.append(f"- Путь: `{fpath.as_posix()}`\n")
-            lines.append(f"- Размер: {n_rows} строк × {n_cols} столбцов\n")
-            lines.append(f"- Столбцы: {list(map(str, df.columns))}\n")
-
-            # Типы данных по столбцам
-            dtypes_map = {str(c): str(t) for c, t in df.dtypes.items()}
-            lines.append("\n### Типы данных (столбец,dtype)\n")
-            dtype_rows = ["column,dtype"] + [f"{col},{dtypes_map[col]}" for col in map(str, df.columns)]
-            lines.append("\n".join(dtype_rows))
-
-            # Пропуски (NaN) по столбцам
-            lines.append("\n### Пропуски (NaN) по столбцам\n")
-            lines.append("column,NaN")
-            nan_counts = df.isna().sum()
-            lines.extend([f"{str(col)},{int(nan_counts[col])}" for col in df.columns])
-
-            # Предпросмотр первых 5 строк 
-            preview_csv = df.head(5).to_csv(index=False)
-            lines.append("\n### Пример данных (первые 5 строк, CSV)\n")
-            lines.append(preview_csv.strip())
-
-            # Данные для JSON-отчёта
-            report_json.append(
-                {
-                    "name": fpath.name,
-                    "path": fpath.as_posix(),
-                    "status": "ok",
-                    "rows": int(n_rows),
-                    "cols": int(n_cols),
-                    "columns": list(map(str, df.columns)),
-                    "dtypes": dtypes_map,
-                    "nan_counts": {str(c): int(nan_counts[c]) for c in df.columns},
-                    # Через pandas.to_json приводим значения к сериализуемым типам
-                    "sample": json.loads(
-                        df.head(5).to_json(orient="records", date_format="iso", force_ascii=False)
-                    ),
-                }
-            )
-        except Exception as e:
-            # Фиксируем ошибку чтения и продолжаем со следующим файлом
-            lines.append("- Статус: ошибка при чтении файла\n")
-            lines.append(f"- Путь: `{fpath.as_posix()}`\n")
-            lines.append(f"- Сообщение: {e}\n")
-
-            # Для JSON фиксируем ошибку
-            report_json.append(
-                {
-                    "name": fpath.name,
-                    "path": fpath.as_posix(),
-                    "status": "error",
-                    "error": str(e),
-                }
-            )
-
-        # Разделитель между файлами
-        lines.append("\n---\n")
-
-    # Готовый отчёт в UTF-8
-    report_path.write_text("\n".join(lines), encoding="utf-8")
-
-    # JSON-версии отчёта
-    json_path = report_path.with_suffix(".json")
-    json_path.write_text(json.dumps(report_json, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Файлы независимы: в пуле процессов (только из CLI) или по очереди; секции пишутся в отчёт по мере готовности
+    workers = max_workers or min(4, len(excel_files))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            _write_reports(report_path, lines, ex.map(_process_one, excel_files, [deep_scan] * len(excel_files)))
+    else:
+        _write_reports(report_path, lines, (_process_one(f, deep_scan) for f in excel_files))
 
 
 if __name__ == "__main__":
-    generate_import_report()
+    generate_import_report(max_workers=None)
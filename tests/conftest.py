@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Корень репозитория в sys.path, чтобы `import src...` работал при любом способе запуска pytest.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
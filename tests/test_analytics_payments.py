@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import analytics_payments
+
+PRODUCTS = ["Web Developer", "Digital Marketing", "UX/UI Design"]
+
+
+@pytest.fixture
+def clean_dir(tmp_path, monkeypatch):
+    rng = np.random.default_rng(1)
+    n = 600
+    created = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24, n), unit="h")
+    deals = pd.DataFrame(
+        {
+            "Id": np.arange(n),
+            "Stage": pd.Categorical(rng.choice(["Payment Done", "Lost", "In Progress", None], n)),
+            "Created Time": created.where(rng.random(n) < 0.95),
+            "Closing Date": (created + pd.Timedelta(days=10)).where(rng.random(n) < 0.5),
+            "Payment Type": pd.Categorical(rng.choice(["One Payment", "Recurring Payments", None], n)),
+            "Product": rng.choice(PRODUCTS + ["Find yourself in IT", None], n),
+            "Education Type": rng.choice(["Morning", "Evening", None], n),
+            "Offer Total Amount": np.where(rng.random(n) < 0.1, np.nan, rng.integers(0, 10000, n)),
+        }
+    )
+    # Несколько row group, чтобы фильтры сканирования действительно отсекали группы.
+    deals.sort_values("Created Time").to_parquet(tmp_path / "Deals.parquet", index=False, row_group_size=100)
+    monkeypatch.setattr(analytics_payments, "CLEAN_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "month, target_products",
+    [(None, None), (None, PRODUCTS), ("2023-04", None), ("2023-04", PRODUCTS), ("2022-01", PRODUCTS)],
+)
+def test_payment_product_metrics_scan_matches_in_memory(clean_dir, month, target_products):
+    deals = analytics_payments.load_deals_for_payments()
+    expected = analytics_payments.payment_product_metrics(deals, month=month, target_products=target_products)
+    actual = analytics_payments.payment_product_metrics(month=month, target_products=target_products)
+    pd.testing.assert_frame_equal(expected, actual)
+
+
+
+def test_payment_product_metrics_month_key_matches_month_string(clean_dir):
+    deals = analytics_payments.load_deals_for_payments()
+    by_str = analytics_payments.payment_product_metrics(deals, month="2023-04")
+    by_key = analytics_payments.payment_product_metrics(deals, month=2023 * 12 + 3)
+    pd.testing.assert_frame_equal(by_str, by_key)
+    assert len(by_str) > 0
+
+
+def test_month_column_and_options_match_period_strings(clean_dir):
+    deals = analytics_payments.load_deals_for_payments()
+    expected = deals["Created Time"].dt.to_period("M").astype("string")
+    assert deals["month"].astype("string").equals(expected)
+    assert analytics_payments.month_options(deals) == sorted(expected.dropna().unique())
+    assert analytics_payments.month_options(deals.iloc[:0]) == []
@@ -0,0 +1,67 @@
+import inspect
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import analytics_sales
+
+pl = pytest.importorskip("polars")
+
+
+def _sample_deals_calls(n_deals: int = 400, n_calls: int = 1500, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    created = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 180 * 24, n_deals), unit="h")
+    closing = created + pd.to_timedelta(rng.integers(1, 60, n_deals), unit="D")
+    closing = closing.where(rng.random(n_deals) < 0.6)
+    deals = pd.DataFrame(
+        {
+            "deal_id": np.arange(n_deals),
+            "contact_id": rng.choice([f"c{i}" for i in range(120)] + [None], n_deals),
+            "created_time": created,
+            "closing_date": closing,
+            "stage": rng.choice(
+                ["Payment Done", "Lost", "Lost Payment Done", "In Progress", "Call Delayed", None], n_deals
+            ),
+            "offer_total": np.where(rng.random(n_deals) < 0.2, np.nan, rng.integers(0, 5000, n_deals)),
+            "initial_amount": rng.integers(0, 1000, n_deals).astype(float),
+            "deal_owner": rng.choice(["Ann", "Bob", "Charlie", "Dana"], n_deals),
+            "lost_reason": rng.choice(["Too expensive", "No answer", None], n_deals),
+            "SLA": np.where(rng.random(n_deals) < 0.3, np.nan, rng.random(n_deals) * 48),
+        }
+    )
+    deals["month"] = deals["created_time"].dt.to_period("M").astype(str)
+    calls = pd.DataFrame(
+        {
+            "call_id": np.arange(n_calls),
+            "contact_id": rng.choice([f"c{i}" for i in range(140)] + [None], n_calls),
+            "call_start_time": pd.Timestamp("2023-01-01")
+            + pd.to_timedelta(rng.integers(0, 200 * 24, n_calls), unit="h"),
+            "call_duration": np.where(rng.random(n_calls) < 0.2, np.nan, rng.integers(0, 600, n_calls)),
+        }
+    )
+    return deals, calls
+
+
+def _normalized(df: pd.DataFrame) -> pd.DataFrame:
+    # pandas отдаёт пропуск в строковых ключах как NaN, polars - как None: сравниваем значения, не типы.
+    df = df.reset_index(drop=True)
+    return df.astype(object).where(df.notna(), None)
+
+
+def _assert_same(expected: pd.DataFrame, actual: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(_normalized(expected), _normalized(actual), check_dtype=False)
+
+
+@pytest.mark.parametrize("month", [None, "2023-03"])
+def test_owner_metrics_polars_matches_pandas(month):
+    deals, calls = _sample_deals_calls()
+    expected = analytics_sales.owner_metrics(deals.copy(), calls.copy(), month=month)
+    actual = analytics_sales.owner_metrics_polars(deals.copy(), calls.copy(), month=month)
+    _assert_same(expected["owners"], actual["owners"])
+    _assert_same(expected["lost_reason_by_owner"], actual["lost_reason_by_owner"])
+
+
+def test_join_nulls_keyword_matches_installed_polars():
+    # join_nulls (polars < 1.24) или nulls_equal - выбирается по сигнатуре установленной версии.
+    assert analytics_sales._JOIN_NULLS_KW in inspect.signature(pl.LazyFrame.join).parameters
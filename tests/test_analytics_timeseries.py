@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import analytics_timeseries
+
+
+@pytest.fixture
+def deals_calls():
+    rng = np.random.default_rng(3)
+    n_deals, n_calls = 400, 1200
+    created = pd.Timestamp("2023-02-01") + pd.to_timedelta(rng.integers(0, 90 * 24 * 60, n_deals), unit="min")
+    closing = created + pd.to_timedelta(rng.integers(-5 * 24, 200 * 24, n_deals), unit="h")
+    deals = pd.DataFrame(
+        {
+            "created_time": created.where(rng.random(n_deals) < 0.95),
+            "closing_date": closing.where(rng.random(n_deals) < 0.6),
+        }
+    )
+    # Звонки начинаются раньше сделок и заканчиваются позже: в общем ряду есть дни только одной из таблиц
+    calls = pd.DataFrame(
+        {
+            "call_start_time": (
+                pd.Timestamp("2023-01-20") + pd.to_timedelta(rng.integers(0, 120 * 24 * 60, n_calls), unit="min")
+            ).where(rng.random(n_calls) < 0.97),
+        }
+    )
+    return deals, calls
+
+
+# Эталон - исходная реализация через resample/merge.
+def _baseline_daily_series(deals: pd.DataFrame, calls: pd.DataFrame) -> pd.DataFrame:
+    deals_daily = (
+        deals.set_index("created_time").resample("D").size().rename("deals_created").reset_index()
+    ).rename(columns={"created_time": "date"})
+    calls_daily = (
+        calls.set_index("call_start_time").resample("D").size().rename("calls_total").reset_index()
+    ).rename(columns={"call_start_time": "date"})
+    daily = pd.merge(deals_daily, calls_daily, on="date", how="outer").fillna(0)
+    daily = daily.sort_values("date").reset_index(drop=True)
+    daily["deal_rate_pct"] = np.where(
+        daily["calls_total"] > 0,
+        (daily["deals_created"] / daily["calls_total"]) * 100.0,
+        np.nan,
+    )
+    return daily
+
+
+@pytest.mark.parametrize("case", ["overlap", "disjoint"])
+def test_daily_series_matches_resample_merge(deals_calls, case):
+    deals, calls = deals_calls
+    if case == "disjoint":
+        # Разрыв между рядами: дни между ними не попадают ни в один из resample
+        calls = calls.assign(call_start_time=calls["call_start_time"] + pd.Timedelta(days=365))
+    expected = _baseline_daily_series(deals, calls)
+    actual = analytics_timeseries.make_daily_series(deals, calls)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def _baseline_closed_daily(deals: pd.DataFrame, upper=None) -> pd.DataFrame:
+    valid = deals.dropna(subset=["closing_date", "created_time"]).copy()
+    valid = valid[valid["closing_date"] >= valid["created_time"]]
+    cd = valid.set_index("closing_date").resample("D").size().rename("deals_closed").reset_index()
+    if upper is not None:
+        cd = cd[cd["closing_date"] <= upper]
+    return cd
+
+
+@pytest.mark.parametrize("upper", [None, pd.Timestamp("2023-05-01")])
+def test_closed_daily_matches_resample(deals_calls, upper):
+    deals, _ = deals_calls
+    expected = _baseline_closed_daily(deals, upper)
+    actual = analytics_timeseries.make_closed_daily(deals, upper)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def _baseline_ttc_hist_counts(valid: pd.Series) -> pd.Series:
+    bins = [-0.001, 3, 7, 14, 30, 60, 120, 365]
+    labels = ["0-3", "4-7", "8-14", "15-30", "31-60", "61-120", "121-365"]
+    binned = pd.cut(valid, bins=bins, labels=labels, include_lowest=True, right=True)
+    return binned.value_counts().sort_index()
+
+
+def test_ttc_hist_counts_matches_cut(deals_calls):
+    deals, _ = deals_calls
+    ttc = analytics_timeseries.make_ttc_series(deals)
+    # Значения ровно на границах корзин и за пределами последней
+    ttc = pd.concat([ttc, pd.Series([0.0, 3.0, 3.0000001, 7.0, 14.0, 365.0, 365.5, 1000.0])], ignore_index=True)
+    expected = _baseline_ttc_hist_counts(ttc)
+    actual = analytics_timeseries.ttc_hist_counts(ttc)
+    pd.testing.assert_series_equal(actual, expected, check_dtype=False)
@@ -0,0 +1,211 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import analytics_ue
+
+PRODUCTS = analytics_ue._PRODUCTS
+
+
+@pytest.fixture
+def tables():
+    rng = np.random.default_rng(2)
+    n = 500
+    deals = pd.DataFrame(
+        {
+            "Id": [f"d{i % 450}" for i in range(n)],
+            "Stage": pd.Categorical(rng.choice(["payment done", "lost", "in progress"], n, p=[0.6, 0.2, 0.2])),
+            "Product": pd.Categorical(rng.choice(PRODUCTS + ["Find yourself in IT", None], n)),
+            "Created Time": (
+                pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 300 * 24, n), unit="h")
+            ).where(rng.random(n) < 0.95),
+            "Contact Name": rng.choice([f"c{i}" for i in range(300)] + [None], n),
+            "Offer Total Amount": np.where(rng.random(n) < 0.1, np.nan, rng.choice([0, 5, 1000, 2500, 6000], n)),
+            "Months of study": np.where(rng.random(n) < 0.1, np.nan, rng.integers(0, 12, n)).astype("float64"),
+            "Course duration": np.where(rng.random(n) < 0.1, np.nan, rng.choice([0, 1, 6, 11], n)).astype("float64"),
+            "Initial Amount Paid": np.where(rng.random(n) < 0.2, np.nan, rng.choice([0, 300, 3000, 7000], n)),
+        }
+    )
+    return {
+        "deals": deals,
+        "contacts": pd.DataFrame({"Id": [f"c{i}" for i in range(280)]}),
+        "calls": pd.DataFrame({"CONTACTID": rng.choice([f"c{i}" for i in range(320)], 900)}),
+        "spend": pd.DataFrame({"Date": pd.date_range("2023-01-01", periods=50), "Spend": rng.random(50) * 100}),
+    }
+
+
+# Эталон - исходная реализация контекста (построчный apply и цикл по продуктам).
+def _baseline_calc_r_i(row: pd.Series) -> pd.Series:
+    months = row["months_of_study"]
+    duration = row["course_duration"]
+    total = row["offer_total_amount"]
+    initial = row["initial_amount_paid"]
+    if pd.isna(months) or pd.isna(duration) or pd.isna(total) or months <= 0 or duration <= 0:
+        return pd.Series({"aov_i": np.nan, "r_i": np.nan})
+    if total - initial > 0 and duration > 1:
+        monthly_tail = (total - initial) / (duration - 1)
+        numerator = initial + max(months - 1, 0) * monthly_tail
+        aov_i = numerator / months if months else np.nan
+    else:
+        aov_i = total / duration
+    r_i = aov_i * months if pd.notna(aov_i) else np.nan
+    return pd.Series({"aov_i": aov_i, "r_i": r_i})
+
+
+def _baseline_unique(series: pd.Series) -> float:
+    return float(series.astype("string").nunique(dropna=True))
+
+
+def _baseline_context(tables: Dict[str, pd.DataFrame]) -> Dict[str, object]:
+    deals = tables["deals"].copy()
+    closed_deals = deals[deals["Stage"] == "payment done"].copy()
+    closed_deals = closed_deals[closed_deals["Offer Total Amount"].fillna(0) > 10].copy()
+    closed_deals["months_of_study"] = closed_deals["Months of study"]
+    closed_deals["course_duration"] = closed_deals["Course duration"]
+    closed_deals["initial_amount_paid"] = closed_deals["Initial Amount Paid"].fillna(0)
+    closed_deals["offer_total_amount"] = closed_deals["Offer Total Amount"].fillna(0)
+    closed_deals[["aov_i", "r_i"]] = closed_deals.apply(_baseline_calc_r_i, axis=1)
+
+    ua_candidates: List[float] = [
+        _baseline_unique(deals["Contact Name"]),
+        _baseline_unique(tables["contacts"]["Id"]),
+        _baseline_unique(tables["calls"]["CONTACTID"]),
+    ]
+    ua = max(ua_candidates)
+    buyers = closed_deals["Id"].nunique()
+    ac = float(tables["spend"]["Spend"].sum())
+    transactions = float(closed_deals["months_of_study"].fillna(0).sum())
+    revenue = float(closed_deals["r_i"].sum())
+    c1 = buyers / ua if ua else np.nan
+    cpa = ac / ua if ua else np.nan
+    aov = revenue / transactions if transactions else np.nan
+    apc = transactions / buyers if buyers else np.nan
+    cltv = aov * apc
+    ltv = cltv * c1
+    metrics = pd.Series(
+        {
+            "UA": ua, "B": buyers, "AC": ac, "T": transactions, "Revenue": revenue, "C1": c1 * 100,
+            "CPA": cpa, "CAC": ac / buyers if buyers else np.nan, "AOV": aov, "APC": apc,
+            "CLTV": cltv, "LTV": ltv, "CM": ua * (ltv - cpa),
+        }
+    ).to_frame(name="value").round(2)
+
+    product_rows = []
+    for product in PRODUCTS:
+        closed_product = closed_deals[closed_deals["Product"] == product]
+        buyers_product = closed_product["Id"].nunique()
+        transactions_product = float(closed_product["months_of_study"].fillna(0).sum())
+        revenue_product = float(closed_product["r_i"].sum())
+        c1_product = buyers_product / ua if ua else np.nan
+        aov_product = revenue_product / transactions_product if transactions_product else np.nan
+        apc_product = transactions_product / buyers_product if buyers_product else np.nan
+        ltv_product = aov_product * apc_product * c1_product
+        product_rows.append(
+            {
+                "Product": product, "UA": ua, "B": buyers_product, "AC": ac, "T": transactions_product,
+                "Revenue": revenue_product, "C1": c1_product * 100, "CPA": cpa, "AOV": aov_product,
+                "APC": apc_product, "CLTV": aov_product * apc_product, "LTV": ltv_product,
+                "CM": ua * (ltv_product - cpa),
+            }
+        )
+    return {"metrics": metrics, "product_metrics": pd.DataFrame(product_rows).set_index("Product").round(2)}
+
+
+def test_context_metrics_match_row_wise_baseline(tables):
+    expected = _baseline_context(tables)["metrics"]
+    actual = analytics_ue._prepare_context(tables)["metrics"]
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_product_metrics_match_per_product_loop(tables):
+    expected = _baseline_context(tables)["product_metrics"]
+    actual = analytics_ue._prepare_context(tables)["product_metrics"]
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_product_metrics_missing_product_gives_nan_ratios(tables):
+    deals = tables["deals"]
+    tables["deals"] = deals[deals["Product"] != "UX/UI Design"]
+    expected = _baseline_context(tables)["product_metrics"]
+    actual = analytics_ue._prepare_context(tables)["product_metrics"]
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    assert actual.loc["UX/UI Design", "B"] == 0 and np.isnan(actual.loc["UX/UI Design", "AOV"])
+
+
+def _baseline_growth_table(segments: Dict[str, Dict[str, float]]) -> pd.DataFrame:
+    multipliers = {"UA": 1.10, "C1": 1.10, "CPA": 0.90, "AOV": 1.10, "APC": 1.10}
+    rows = []
+    for segment, data in segments.items():
+        base_cm = data["CM"]
+        for lever in analytics_ue._GROWTH_LEVERS:
+            adj = {name: data[name] for name in multipliers}
+            adj[lever] *= multipliers[lever]
+            if any(pd.isna(x) for x in adj.values()):
+                new_cm = np.nan
+            else:
+                new_cm = adj["UA"] * (adj["AOV"] * adj["APC"] * adj["C1"] - adj["CPA"])
+            rows.append(
+                {
+                    "Segment": segment,
+                    "Metric": lever,
+                    "CM_base": base_cm,
+                    "CM_new": new_cm,
+                    "CM_delta": new_cm - base_cm if pd.notna(base_cm) else np.nan,
+                    "CM_delta_%": ((new_cm / base_cm) - 1) * 100 if base_cm else np.nan,
+                }
+            )
+    return pd.DataFrame(rows).round(2)
+
+
+def test_growth_table_matches_nested_loops(tables):
+    segments = analytics_ue._prepare_context(tables)["segments"]
+    # Краевые сегменты: нулевой CM (без процента) и пропуск в одном из рычагов
+    segments["Zero CM"] = {"UA": 100.0, "C1": 0.1, "CPA": 5.0, "AOV": 50.0, "APC": 1.0, "CM": 0.0}
+    segments["No AOV"] = {"UA": 100.0, "C1": 0.1, "CPA": 5.0, "AOV": np.nan, "APC": 2.0, "CM": np.nan}
+    expected = _baseline_growth_table(segments)
+    actual = analytics_ue._growth_table(segments)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def _baseline_ua_daily_counts(deals: pd.DataFrame) -> Dict[str, float]:
+    deals_copy = deals.copy()
+    deals_copy["Created Time"] = pd.to_datetime(deals_copy["Created Time"], errors="coerce")
+    deals_copy["created_day"] = deals_copy["Created Time"].dt.normalize()
+
+    def calc(df: pd.DataFrame) -> float:
+        if df.empty or "Contact Name" not in df.columns:
+            return float("nan")
+        ua_total = _baseline_unique(df["Contact Name"])
+        dates = df["created_day"].dropna()
+        if dates.empty or not ua_total:
+            return float("nan")
+        days_span = (dates.max() - dates.min()).days + 1
+        if days_span <= 0:
+            return float("nan")
+        return ua_total / days_span
+
+    counts: Dict[str, float] = {"Business": calc(deals_copy)}
+    for product in PRODUCTS:
+        counts[product] = calc(deals_copy[deals_copy["Product"] == product])
+    return counts
+
+
+@pytest.mark.parametrize("case", ["full", "missing_product", "one_day", "no_dates", "no_contacts", "empty"])
+def test_ua_daily_counts_match_per_product_filters(tables, case):
+    deals = tables["deals"]
+    if case == "missing_product":
+        deals = deals[deals["Product"] != "Digital Marketing"]
+    elif case == "one_day":
+        deals = deals.assign(**{"Created Time": pd.Timestamp("2023-03-01 12:00")})
+    elif case == "no_dates":
+        deals = deals.assign(**{"Created Time": pd.NaT})
+    elif case == "no_contacts":
+        deals = deals.assign(**{"Contact Name": None})
+    elif case == "empty":
+        deals = deals.iloc[:0]
+    expected = _baseline_ua_daily_counts(deals)
+    actual = analytics_ue._ua_daily_counts(deals)
+    assert list(actual) == list(expected)
+    np.testing.assert_allclose(list(actual.values()), list(expected.values()), rtol=0, atol=0)
@@ -0,0 +1,77 @@
+import warnings
+
+import pandas as pd
+import pytest
+
+from src import cleaning
+
+
+def _raw_frames():
+    return {
+        "contacts": pd.DataFrame(
+            {
+                "Id": [1, 1, 2, 3],
+                "Contact Owner Name": [" Ann ", " Ann ", "Bob", None],
+                "Created Time": ["01.02.2024 10:00", "01.02.2024 10:00", "02.02.2024 11:00", "03.02.2024 12:00"],
+                "Modified Time": ["05.02.2024 10:00"] * 4,
+                "Empty": [None] * 4,
+            }
+        ),
+        "calls": pd.DataFrame(
+            {
+                "Id": [10, 10, 11, 12],
+                "Call Start Time": ["01.02.2024 10:00", "01.02.2024 10:00", "02.02.2024 11:00", "bad"],
+                "CONTACTID": [" 1", " 1", "2 ", None],
+                "Scheduled in CRM": [1, 1, 0, None],
+                "Call Type": ["Outbound", "Outbound", None, "Inbound"],
+                "Call Status": ["Attended", "Attended", "Missed", None],
+                "Outgoing Call Status": [None, None, "Completed", "Scheduled"],
+            }
+        ),
+        "spend": pd.DataFrame(
+            {
+                "Date": ["2024-02-01 00:00:00", "2024-02-01 00:00:00", "2024-02-02 00:00:00"],
+                "Source": ["Google", "Google", "Facebook"],
+                "Impressions": [100, 100, None],
+                "Clicks": [5, 5, 1],
+                "Spend": [10.5, 10.5, None],
+            }
+        ),
+        "deals": pd.DataFrame(
+            {
+                "Id": [1, 1, 2, None, 4],
+                "Created Time": ["01.02.2024 10:00", "01.02.2024 10:00", None, "03.02.2024 12:00", "04.02.2024 13:00"],
+                "Closing Date": ["10.02.2024", "10.02.2024", None, None, "12.02.2024"],
+                "Initial Amount Paid": [100, 100, None, 5, 7],
+                "Offer Total Amount": [1000, 1000, 2000, None, 3000],
+                "Course duration": [6, 6, 11, None, 6],
+                "Months of study": [1, 1, None, 2, 3],
+                "SLA": [pd.Timedelta(hours=2), pd.Timedelta(hours=2), None, None, pd.Timedelta(minutes=30)],
+                "Stage": ["Payment Done", "Payment Done", "Lost", None, "New Lead"],
+                "Quality": [None, None, "A", "B", "C"],
+                "Payment Type": ["one payment", "one payment", None, None, "recurring"],
+                "Source": ["Google", "Google", None, "Facebook", None],
+            }
+        ),
+    }
+
+
+@pytest.mark.parametrize("name", ["contacts", "calls", "spend", "deals"])
+def test_clean_without_copy_raises_no_chained_assignment_warning(name):
+    # Как в _clean_one: исходник остается жив у вызывающего, clean_* получает его без копии.
+    df_raw = _raw_frames()[name]
+    clean_fn = getattr(cleaning, f"clean_{name}")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", pd.errors.SettingWithCopyWarning)
+        df_clean, _ = clean_fn(df_raw)
+    expected, _ = clean_fn(_raw_frames()[name].copy())
+    pd.testing.assert_frame_equal(df_clean, expected)
+
+
+def test_drop_duplicate_rows_matches_drop_duplicates():
+    df = pd.DataFrame({"Id": [3, 1, 3, 2, 1], "v": [1, 2, 3, 4, 5]})
+    for subset in (None, ["Id"]):
+        pd.testing.assert_frame_equal(
+            cleaning.drop_duplicate_rows(df, subset=subset), df.drop_duplicates(subset=subset, keep="first")
+        )
+    pd.testing.assert_frame_equal(cleaning.drop_duplicate_rows(df.iloc[:0]), df.iloc[:0])
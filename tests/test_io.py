@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src import io
+
+
+@pytest.fixture
+def clean_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(io, "CLEAN_DIR", tmp_path)
+    monkeypatch.setattr(io, "_CLEAN_PREFIX", str(tmp_path) + os.sep)
+    io.load_clean_table.cache_clear()
+    yield tmp_path
+    io.load_clean_table.cache_clear()
+
+
+@pytest.fixture
+def deals():
+    return pd.DataFrame(
+        {
+            "Id": np.arange(8),
+            "Duration": [0, 5, None, 3, -1, 7, 0, 2],
+            "Product": ["a", "b", None, "a", "b", "c", "a", "b"],
+        }
+    )
+
+
+FILTERS = [
+    [("Duration", ">", 0)],
+    [("Duration", ">", 0), ("Product", "in", ["a", "b"])],
+    [("Product", "!=", "a")],
+    [("Duration", "not in", [0])],
+    [("Product", "not in", {"a"})],
+    [("Duration", "==", 3)],
+    [("Duration", "<=", 2)],
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("columns", [None, ["Id"]])
+def test_read_clean_csv_fallback_applies_filters(clean_dir, deals, filters, columns):
+    deals.to_parquet(clean_dir / "Deals.parquet", index=False)
+    from_parquet = io.read_clean("Deals", columns=columns, filters=filters)
+    (clean_dir / "Deals.parquet").unlink()
+    deals.to_csv(clean_dir / "Deals.csv", index=False)
+    from_csv = io.read_clean("Deals", columns=columns, filters=filters)
+    # Пропуск в строковом столбце Parquet отдаёт как None, CSV - как NaN
+    pd.testing.assert_frame_equal(
+        from_parquet.astype(object).where(from_parquet.notna(), None),
+        from_csv.astype(object).where(from_csv.notna(), None),
+        check_dtype=False,
+    )
+
+
+def test_read_clean_caches_list_filters(clean_dir, deals):
+    deals.to_parquet(clean_dir / "Deals.parquet", index=False)
+    filters = [("Product", "in", ["a", "b"])]
+    first = io.read_clean("Deals", filters=filters)
+    second = io.read_clean("Deals", filters=filters)
+    assert io.load_clean_table.cache_info().hits == 1
+    assert sorted(first["Product"].unique()) == ["a", "b"]
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_read_clean_rejects_unknown_filter_operator(clean_dir, deals):
+    deals.to_csv(clean_dir / "Deals.csv", index=False)
+    with pytest.raises(ValueError):
+        io.read_clean("Deals", filters=[("Duration", "~", 1)])
+
+
+def test_read_table_csv_keeps_c_engine_dtypes(tmp_path):
+    path = tmp_path / "Spend.csv"
+    pd.DataFrame(
+        {
+            "Date": ["2023-01-05", "2023-01-06"],
+            "Created Time": ["2023-01-05 10:30:00", None],
+            "Clicks": [1, 2],
+            "Spend": [1.5, None],
+        }
+    ).to_csv(path, index=False)
+    df = io.read_table(path)
+    pd.testing.assert_frame_equal(df, pd.read_csv(path, engine="c"))
+    assert df["Date"].dtype == object and df["Created Time"].dtype == object
+
+
+def _layout(path):
+    meta = pq.ParquetFile(path).metadata
+    return meta.num_row_groups, {meta.row_group(0).column(i).compression for i in range(meta.num_columns)}
+
+
+def test_parquet_write_paths_share_one_policy(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 150_000
+    df = pd.DataFrame(
+        {
+            "contact_id": rng.choice([f"c{i}" for i in range(500)], n),
+            "created_time": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 10**6, n), unit="s"),
+            "amount": rng.integers(0, 100, n),
+        }
+    )
+    io.write_table(df, tmp_path / "plain.parquet", verbose=False)
+    io.write_parquet_optimized(df, tmp_path / "sorted.parquet", sort_by=["contact_id", "created_time"], verbose=False)
+
+    assert _layout(tmp_path / "plain.parquet") == _layout(tmp_path / "sorted.parquet") == (3, {"ZSTD"})
+    expected = df.sort_values(["contact_id", "created_time"], kind="stable", ignore_index=True)
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "sorted.parquet"), expected)
+
+
+def test_write_table_recreates_deleted_directory(tmp_path, monkeypatch):
+    out = tmp_path / "out"
+    df = pd.DataFrame({"a": [1, 2]})
+    mkdir_calls = []
+    real_mkdir = io.Path.mkdir
+    monkeypatch.setattr(io.Path, "mkdir", lambda self, *a, **kw: mkdir_calls.append(self) or real_mkdir(self, *a, **kw))
+
+    io.write_table(df, out / "t.csv", verbose=False)
+    io.write_table(df, out / "t.parquet", verbose=False)
+    assert mkdir_calls == [out]
+
+    # Каталог удалён во время работы процесса: запись создаёт его заново, а не падает
+    shutil.rmtree(out)
+    io.write_table(df, out / "t.parquet", verbose=False)
+    pd.testing.assert_frame_equal(pd.read_parquet(out / "t.parquet"), df)
+    assert mkdir_calls == [out, out]
+
+
+def test_dumps_json_same_values_with_and_without_orjson(monkeypatch):
+    pytest.importorskip("orjson")
+    obj = {
+        "nan": float("nan"),
+        "inf": [np.inf, -np.inf, np.float64("nan")],
+        "ints": [np.int64(7), np.int32(-3), np.uint8(200)],
+        "floats": [np.float32(0.1), np.float64(2.5), 1.25],
+        "flags": [np.bool_(True), False, None],
+        "array": np.array([[1.5, np.nan], [3.0, 4.0]]),
+        1: {"вложенный": ("кортеж", "значений")},
+    }
+    with_orjson = json.loads(io.dumps_json(obj))
+    monkeypatch.setattr(io, "orjson", None)
+    stdlib = io.dumps_json(obj)
+    assert json.loads(stdlib) == with_orjson
+    assert b"NaN" not in stdlib and b"Infinity" not in stdlib
@@ -0,0 +1,89 @@
+import json
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from src import io, simple_import
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Id", "Name", "Amount", "Big", "Created", "Flag", "Start", "Mixed"])
+    ws.append([5805028000000000001, "Ann", 0.1 + 0.2, 5.805028e18, datetime(2023, 1, 5, 10, 30), True,
+               time(10, 30), datetime(2023, 1, 5)])
+    ws.append([2, None, 1 / 3, 1.5e-16, datetime(2023, 2, 1), False, time(0, 0, 5), "n/a"])
+    ws.append([3, "Борис", None, 123456.789012345678, None, None, None, datetime(2023, 1, 6, 12, 0)])
+    ws.append([4, "Dana", 2.0, -7.25e17, datetime(2023, 3, 15, 23, 59, 59), True, time(23, 59, 59), 7])
+    ws.append([5, "Eve", 1e-5, 0.0, datetime(2023, 4, 1), False, time(12, 0), None])
+    ws.append([6, "Frank", 12.5, 1.0, datetime(2023, 5, 1), True, time(8, 15), "x"])
+    wb.save(raw / "Deals.xlsx")
+
+    wb = Workbook()
+    ws = wb.active
+    # Числовые, датированные и NA-строки в заголовке pandas оставляет именами столбцов
+    ws.append(["CONTACTID", "Call Duration (in seconds)", 2024, 2024.5, datetime(2023, 1, 1), "NA", None])
+    for i in range(20):
+        ws.append([f"c{i}", None if i % 4 == 0 else i * 7, i, None, "x", i % 2, 1])
+    wb.save(raw / "Calls.xlsx")
+
+    pd.DataFrame(
+        {"Source": ["Google", None, "Facebook"], "Spend": [1.25, np.nan, 3.0], "Clicks": [1, 2, 3]}
+    ).to_parquet(raw / "Spend.parquet", index=False)
+    return raw
+
+
+def _expected_entry(path):
+    # Эталон - исходная реализация: полный read_excel/read_parquet и выборка через to_json.
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_excel(path)
+    cols = list(map(str, df.columns))
+    return {
+        "name": path.name,
+        "rows": len(df),
+        "cols": df.shape[1],
+        "columns": cols,
+        "dtypes": {str(c): str(t) for c, t in df.dtypes.items()},
+        "nan_counts": {str(c): int(n) for c, n in df.isna().sum().items()},
+        "sample": json.loads(df.head(5).to_json(orient="records", date_format="iso", force_ascii=False)),
+    }
+
+
+def _report(raw_dir, tmp_path, **kwargs):
+    report_path = tmp_path / "reports" / "import_checklist.md"
+    simple_import.generate_import_report(raw_dir, report_path, **kwargs)
+    return (
+        json.loads(report_path.with_suffix(".json").read_text(encoding="utf-8")),
+        report_path.read_text(encoding="utf-8"),
+    )
+
+
+@pytest.mark.parametrize("use_calamine", [True, False])
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_import_report_json_matches_full_read(raw_dir, tmp_path, monkeypatch, use_orjson, use_calamine):
+    if not use_orjson:
+        # Стандартная установка без orjson: отчёт пишет stdlib json
+        monkeypatch.setattr(io, "orjson", None)
+    if not use_calamine:
+        monkeypatch.setattr(simple_import, "CalamineWorkbook", None)
+    elif simple_import.CalamineWorkbook is None:
+        pytest.skip("python-calamine не установлен")
+    report, _ = _report(raw_dir, tmp_path)
+    by_name = {entry["name"]: entry for entry in report}
+    assert sorted(by_name) == ["Calls.xlsx", "Deals.xlsx", "Spend.parquet"]
+    for name, entry in by_name.items():
+        assert entry["status"] == "ok"
+        expected = _expected_entry(raw_dir / name)
+        assert {key: entry[key] for key in expected} == expected, name
+
+
+def test_import_report_pool_matches_serial(raw_dir, tmp_path):
+    serial = _report(raw_dir, tmp_path / "serial", max_workers=1)
+    pooled = _report(raw_dir, tmp_path / "pooled", max_workers=2)
+    assert serial == pooled